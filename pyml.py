@@ -14,8 +14,22 @@ import graphviz
 import textwrap
 import os
 import sys
+import math
+import heapq
+import tempfile
+import threading
+import atexit
+import shutil
+import abc
+import numbers
+import hashlib
+import pickle
+import struct
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
 from os.path import exists
 import pandas as pd
+import numpy as np
 from copy import deepcopy
 
 # text for SVG included files
@@ -89,6 +103,94 @@ actor_svg = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
   </g>
 </svg>"""
 
+and_node_svg = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<svg
+   width="50"
+   height="45"
+   transform="rotate(0) translate(0,0)"
+   version="1.1"
+   xmlns="http://www.w3.org/2000/svg"
+   xmlns:svg="http://www.w3.org/2000/svg">
+  <path
+     fill="none"
+     stroke="#000000"
+     stroke-width="2.61613"
+     d="M 24.909933,5.0655629 V 0.01801368"
+     id="top_connector" />
+  <path
+     d="M 5.0927534,45.391608 H 45.092753 v -20.47619 c 0,-11.267907 -9.000045,-19.9999995 -20,-19.9999995 -10.999955,0 -19.9999997,8.7320915 -19.9999997,19.9999995 z m 2.857143,-2.857143 V 24.915418 c 0,-9.760663 7.6399546,-16.6666664 17.1428566,-16.6666664 9.502902,0 17.142857,7.3821944 17.142857,17.1428564 v 17.142857 z"
+     id="and_symbol" />
+</svg>"""
+
+or_node_svg = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<svg
+   width="50"
+   height="52"
+   version="1.1"
+   xmlns="http://www.w3.org/2000/svg">
+   <g transform="translate(-22.95,2.65)">
+    <path
+       fill="none"
+       stroke="#000000"
+       stroke-width="2.5"
+       d="M 48.32812,4.1093798 48.328126,-3 m -6e-6,52.95376 V 43.305394 40.81263"
+       id="connectors" />
+    <path
+       fill-rule="evenodd"
+       d="m 28.32812,49.23438 2.4375,-2 c 0,0 7.000049,-5.65625 17.5625,-5.65625 10.562451,0 17.5625,5.65625 17.5625,5.65625 l 2.4375,2 V 32.07813 c 10e-7,-2.408076 0.02451,-7.689699 -2.40625,-13.625 C 63.491106,12.517829 58.578604,5.9165938 49.04687,0.76562982 L 48.32812,2.0781298 47.60937,0.76562982 C 28.54371,11.068743 28.32812,27.321556 28.32812,32.07813 Z m 3,-5.875 V 32.07813 c 0,-4.684173 -0.130207,-18.28685 17,-27.9687502 8.429075,4.766786 12.68391,10.5212812 14.8125,15.7187502 2.195424,5.360661 2.187501,9.841925 2.1875,12.25 v 11.25 c -3.108434,-1.873588 -9.04935,-4.75 -17,-4.75 -7.973354,0 -13.900185,2.908531 -17,4.78125 z"
+       id="path382" />
+   </g>
+ </svg>"""
+
+or_node_bottom_svg = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
+<svg
+   width="50"
+   height="49"
+   version="1.1"
+   xmlns="http://www.w3.org/2000/svg">
+   <g transform="translate(-22.95,0.3)">
+     <line x1="48.35" x2="48.35" y1="0" y2="3" stroke="black" stroke-width="2.5"/>
+   </g>
+ </svg>"""
+
+fault_tree_symbol_svgs = {'AND_node.svg': and_node_svg, 'OR_node.svg': or_node_svg, 'OR_node_bottom.svg': or_node_bottom_svg}
+
+
+def write_symbol_files(symbols, directory):
+    """
+    Writes the SVG files in a dictionary of file names and contents into a directory unless they are already there.
+
+    Each file is written under a unique temporary name and then renamed into place, so concurrent calls never read or overwrite a partly written file.
+    """
+    os.makedirs(directory, exist_ok=True)
+    for name, text in symbols.items():
+        path = os.path.join(directory, name)
+        if exists(path):
+            with open(path) as file:
+                if file.read() == text:
+                    continue
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "w") as file:
+            file.write(text)
+        os.replace(temporary, path)
+
+
+symbol_directories = {}  # process id -> private temporary directory of the gate symbol files
+symbol_directories_lock = threading.Lock()
+
+
+def temporary_symbol_directory():
+    """
+    Returns a private temporary directory holding the gate symbol files, created by ``tempfile.mkdtemp`` on first use in each process and removed when the process exits.
+    """
+    with symbol_directories_lock:
+        directory = symbol_directories.get(os.getpid())
+        if directory is None:
+            directory = symbol_directories[os.getpid()] = tempfile.mkdtemp(prefix='pyml-symbols-')
+            atexit.register(shutil.rmtree, directory, True)
+            write_symbol_files(fault_tree_symbol_svgs, directory)
+        return directory
+
 def context_diagram(system, external_systems, filename=None, format='svg', engine='neato'):
     """
     Returns a context diagram.
@@ -421,12 +523,12 @@ def tree(element_dependencies, filename=None, format='svg'):
 
 
 
-def fault_tree_diagram(ft, filename=None, format='svg'):
+def fault_tree_diagram(ft, filename=None, format='svg', normalize=False):
     """ Returns a fault tree diagram.
 
     Parameters
     ----------
-    ft : list of tuples
+    ft : list of tuples or FaultTree
         A list of the faults as a tree hierarchy. Each fault is defined in a tuple containing the fault name, type, and underlying faults (if any) in the form
         ``("fault name", "fault name", list of fault branches)``
         with the branches as a list in the form
@@ -438,12 +540,15 @@ def fault_tree_diagram(ft, filename=None, format='svg'):
 
         And: "And" "and" "AND" \n
         Or: "Or" "or" "OR" \n
-        Basic: "Basic" "basic" "BASIC"
+        Basic: "Basic" "basic" "BASIC" \n
+        Vote: "Vote k" "KofN k" for a gate that occurs when at least k of its branches occur
 
     filename : string, optional
         A filename for the output not including a filename extension. The extension will specified by the format parameter.
     format : string, optional
         The file format of the graphic output. Note that bitmap formats (png, bmp, or jpeg) will not be as sharp as the default svg vector format and most particularly when magnified.
+    normalize : boolean, optional
+        Draw the smaller equivalent tree produced by ``normalize_fault_tree``.
 
     Returns
     -------
@@ -451,6 +556,8 @@ def fault_tree_diagram(ft, filename=None, format='svg'):
         Save the graph source code to file, and open the rendered result in its default viewing application. PyML calls the Graphviz API for this.
 
     """
+    if normalize:
+        ft = normalize_fault_tree(ft)
     verbose = False
     wrap_width = 15
     def wrap(text): return textwrap.fill(
@@ -462,76 +569,19 @@ def fault_tree_diagram(ft, filename=None, format='svg'):
                                 edge_attr=edge_attr, engine="dot", format=format)
     fault_tree.attr(rankdir='TB', splines='line',  ) # polyline
 
+    # the gate symbols are included image files, looked up through the graph's imagepath
+    if filename is not None:
+        symbol_directory = os.path.dirname(os.path.abspath(filename))
+        write_symbol_files(fault_tree_symbol_svgs, symbol_directory)
+    else:
+        symbol_directory = temporary_symbol_directory()
+    fault_tree.attr(imagepath=symbol_directory)
 
-    # create required SVG included files
-
-    and_node = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
-<svg
-   width="50"
-   height="45"
-   transform="rotate(0) translate(0,0)"
-   version="1.1"
-   xmlns="http://www.w3.org/2000/svg"
-   xmlns:svg="http://www.w3.org/2000/svg">
-  <path
-     fill="none"
-     stroke="#000000"
-     stroke-width="2.61613"
-     d="M 24.909933,5.0655629 V 0.01801368"
-     id="top_connector" />
-  <path
-     d="M 5.0927534,45.391608 H 45.092753 v -20.47619 c 0,-11.267907 -9.000045,-19.9999995 -20,-19.9999995 -10.999955,0 -19.9999997,8.7320915 -19.9999997,19.9999995 z m 2.857143,-2.857143 V 24.915418 c 0,-9.760663 7.6399546,-16.6666664 17.1428566,-16.6666664 9.502902,0 17.142857,7.3821944 17.142857,17.1428564 v 17.142857 z"
-     id="and_symbol" />
-</svg>"""
-
-    or_node = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
-<svg
-   width="50"
-   height="52"
-   version="1.1"
-   xmlns="http://www.w3.org/2000/svg">
-   <g transform="translate(-22.95,2.65)">
-    <path
-       fill="none"
-       stroke="#000000"
-       stroke-width="2.5"
-       d="M 48.32812,4.1093798 48.328126,-3 m -6e-6,52.95376 V 43.305394 40.81263"
-       id="connectors" />
-    <path
-       fill-rule="evenodd"
-       d="m 28.32812,49.23438 2.4375,-2 c 0,0 7.000049,-5.65625 17.5625,-5.65625 10.562451,0 17.5625,5.65625 17.5625,5.65625 l 2.4375,2 V 32.07813 c 10e-7,-2.408076 0.02451,-7.689699 -2.40625,-13.625 C 63.491106,12.517829 58.578604,5.9165938 49.04687,0.76562982 L 48.32812,2.0781298 47.60937,0.76562982 C 28.54371,11.068743 28.32812,27.321556 28.32812,32.07813 Z m 3,-5.875 V 32.07813 c 0,-4.684173 -0.130207,-18.28685 17,-27.9687502 8.429075,4.766786 12.68391,10.5212812 14.8125,15.7187502 2.195424,5.360661 2.187501,9.841925 2.1875,12.25 v 11.25 c -3.108434,-1.873588 -9.04935,-4.75 -17,-4.75 -7.973354,0 -13.900185,2.908531 -17,4.78125 z"
-       id="path382" />
-   </g>
- </svg>"""
-
-    or_node_bottom = """<?xml version="1.0" encoding="UTF-8" standalone="no"?>
-<svg
-   width="50"
-   height="49"
-   version="1.1"
-   xmlns="http://www.w3.org/2000/svg">
-   <g transform="translate(-22.95,0.3)">
-     <line x1="48.35" x2="48.35" y1="0" y2="3" stroke="black" stroke-width="2.5"/>
-   </g>
- </svg>"""
-
-    f3 = open("AND_node.svg", "w")
-    f3.write(and_node)
-    f3.close()
-
-    f2 = open("OR_node.svg", "w")
-    f2.write(or_node)
-    f2.close()
-
-    f1 = open("OR_node_bottom.svg", "w")
-    f1.write(or_node_bottom)
-    f1.close()
-
-    for node in ft:
-        node_name, node_type, leafs = node[0], node[1], node[2]
-        if verbose: print(f'{node[2]=} {node_name=}, {node_type=} {leafs=}')
+    for node_name, node_type, probability, leafs in fault_tree_rows(ft):
+        gate_type = node_type
+        if verbose: print(f'{node_name=}, {node_type=} {leafs=}')
         #fault_tree.node(row[0], row[0]+' '+row[1])
-        if node_type == "basic" or node_type == "Basic" or node_type == "BASIC":
+        if gate_type == "basic":
             fault_tree.node(node_name, f'''<
             <table border="0" cellborder="0" cellspacing="0" cellpadding="0">
               <tr>
@@ -542,13 +592,13 @@ def fault_tree_diagram(ft, filename=None, format='svg'):
             </td>
               </tr>
               <tr>
-                <td port="{node_type}"></td>
+                <td port="{gate_type}"></td>
               </tr>
               <tr>
                 <td></td>
               </tr>
             </table>>''')
-        if node_type == "or" or node_type == "Or" or node_type == "OR":
+        if gate_type == "or":
             fault_tree.node(node_name, f'''<
             <table border="0" cellborder="0" cellspacing="0" cellpadding="0">
               <tr>
@@ -559,13 +609,13 @@ def fault_tree_diagram(ft, filename=None, format='svg'):
             </td>
               </tr>
               <tr>
-                <td port="{node_type}"><img src="OR_node.svg"/></td>
+                <td port="{gate_type}"><img src="OR_node.svg"/></td>
               </tr>
               <tr>
                 <td><img src="OR_node_bottom.svg"/></td>
               </tr>
             </table>>''')
-        if node_type == "and" or node_type == "And" or node_type == "AND":
+        if gate_type == "and":
             fault_tree.node(node_name, f'''<
             <table border="0" cellborder="0" cellspacing="0" cellpadding="0">
               <tr>
@@ -576,7 +626,26 @@ def fault_tree_diagram(ft, filename=None, format='svg'):
             </td>
               </tr>
               <tr>
-                <td port="{node_type}"><img src="AND_node.svg"/></td>
+                <td port="{gate_type}"><img src="AND_node.svg"/></td>
+              </tr>
+              <tr>
+                <td><img src="OR_node_bottom.svg"/></td>
+              </tr>
+            </table>>''')
+        if gate_type.startswith("vote"):
+            gate_type = "vote"
+            fault_tree.node(node_name, f'''<
+            <table border="0" cellborder="0" cellspacing="0" cellpadding="0">
+              <tr>
+            <td colspan="2">
+            <table border="0" cellborder="1" cellspacing="0" cellpadding="0">
+              <tr><td port="top">{wrap(node_name)}</td></tr>
+            </table>
+            </td>
+              </tr>
+              <tr>
+                <td port="{gate_type}"><img src="OR_node.svg"/></td>
+                <td>{vote_threshold(node_type)}/{len([leaf for leaf in leafs if leaf != ''])}</td>
               </tr>
               <tr>
                 <td><img src="OR_node_bottom.svg"/></td>
@@ -585,7 +654,7 @@ def fault_tree_diagram(ft, filename=None, format='svg'):
         if verbose: print("Leaves")
         for leaf in leafs:
             if verbose: print(node_name,'->', leaf)
-            if leaf != '':fault_tree.edge(node_name+':'+node_type+':s', leaf+':top:n') # leaf+':top:n' closer but not symmetrical
+            if leaf != '':fault_tree.edge(node_name+':'+gate_type+':s', leaf+':top:n') # leaf+':top:n' closer but not symmetrical
 
     if filename != None:
         fault_tree.render()
@@ -711,7 +780,9 @@ class Node(object):
         # has finished before beginning.
         self._lag = lag  # TODO
 
-        self.drag = None  # TODO
+        # The amount by which the task lengthens the project, the reduction in
+        # the project duration if the task took no time at all.
+        self._drag = None
 
         # Earliest start time.
         self._es = None
@@ -727,11 +798,14 @@ class Node(object):
 
         # The amount time that the activity can be delayed without
         # changing the start of any other activity.
-        self._free_float = None  # TODO
+        self._free_float = None
 
         # The amount of time that the activity can be delayed without
         # increasing the overall project's duration.
-        self._total_float = None  # TODO
+        self._total_float = None
+
+        # Whether the floats and drags of the child nodes need recomputing.
+        self._floats_stale = False
 
         self.nodes = []  # set()
         self.name_to_node = {}
@@ -745,6 +819,18 @@ class Node(object):
 
         self.exit_node = None
 
+        # Incremental rescheduling state, built by the first what-if change:
+        # topological ranks, insertion positions, the best path ending at each
+        # node, lazy max-heaps of earliest finishes and path keys, the project
+        # finish and the nodes without successors.
+        self._ranks = None
+        self._positions = None
+        self._path_keys = None
+        self._finish_heap = None
+        self._path_heap = None
+        self._finish = None
+        self._sinks = None
+
     def lookup_node(self, name):
         return self.name_to_node[name]
 
@@ -810,6 +896,28 @@ class Node(object):
     def lf(self, v):
         self._lf = v
 
+    @property
+    def total_float(self):
+        if self.parent is not None and self.parent._floats_stale:
+            self.parent.update_floats()
+        return self._total_float
+
+    @property
+    def free_float(self):
+        if self.parent is not None and self.parent._floats_stale:
+            self.parent.update_floats()
+        return self._free_float
+
+    @property
+    def drag(self):
+        if self.parent is not None and self.parent._floats_stale:
+            self.parent.update_floats()
+        return self._drag
+
+    @drag.setter
+    def drag(self, v):
+        self._drag = v
+
     def __repr__(self):
         return str(self.name)
 
@@ -836,14 +944,22 @@ class Node(object):
         assert isinstance(node, Node), 'Only Node instances can be added, not %s.' % (
             type(node).__name__,)
         assert node.duration is not None, 'Duration must be specified.'
-        if node in self.nodes:
+        if node.name in self.name_to_node:  # nodes are equal by name, and a list scan is quadratic over many adds
             return
         #self.nodes.add(node)
         self.nodes.append(node)
         self.name_to_node[node.name] = node
         node.parent = self
         self.forward_pending.add(node)
+        if self._ranks is not None:
+            # a new task has no links yet, so it goes last in the topological order
+            self._ranks[node] = len(self._ranks)
+            self._positions[node] = len(self._positions)
+            self._sinks.add(node)
+            self.reschedule(forward=[node], backward=[node])
+            return node
         self._critical_path = None
+        self._floats_stale = True
         return node
 
     def link(self, from_node, to_node=None):
@@ -863,6 +979,8 @@ class Node(object):
             assert isinstance(to_node, Node)
             from_node.to_nodes.add(to_node)
             to_node.incoming_nodes.add(from_node)
+            self._ranks = None  # use add_link to keep an incremental schedule
+            self._floats_stale = True
         else:
             self.to_nodes.add(from_node)
             from_node.incoming_nodes.add(self)
@@ -917,22 +1035,20 @@ class Node(object):
             if self.parent:
                 self.parent.backward_pending.append(self)
 
-    def update_backward(self):
+    def update_backward(self, finish=None):
         """
         Updates backward timing calculations for the current node.
+
+        Assumes the latest start of every succeeding node has already been set. A node without successors may finish as late as ``finish``, the project finish, or its own earliest finish if that is not given.
         """
-#        print 'update_backward0:',self.name,self.ls,self.lf
-#        print '\tto_nodes:',[_.ls for _ in self.to_nodes]
-        if self.lf is None:
-            if self.to_nodes:
-                #print min([_.ls for _ in self.to_nodes], 1e99999)
-                self.lf = min([_.ls for _ in self.to_nodes])
-            else:
-                self.lf = self.ef
-            #assert self.lf is not None, 'No latest finish time could be found.' #TODO
+        successors = [to_node for to_node in self.to_nodes if to_node is not self and to_node.parent is self.parent]
+        if successors:
+            # The latest finish is the latest start of the first succeeding
+            # activity less its lag.
+            self.lf = min(to_node.ls - to_node.lag for to_node in successors)
+        else:
+            self.lf = self.ef if finish is None else finish
         self.ls = self.lf - self.duration
-        #self.ls = (self.lf or 0) - self.duration
-#        print 'update_backward1:',self.name,self.ls,self.lf
 
     def add_exit(self):
         """
@@ -974,18 +1090,11 @@ class Node(object):
                 node.update_forward()
 #        print
 
-        i = 0
-        backward_priors = set()
-        while self.backward_pending:
-            i += 1
-#            print '\rCalculating backward paths %i...' % (i,),
-#            sys.stdout.flush()
-            node = self.backward_pending.pop()
-            if node in backward_priors:
-                continue
-            #backward_priors.add(node)
-            node.update_backward()
-#        print
+        # every task without successors may finish as late as the project
+        self.backward_pending.clear()
+        finish = max((node.ef for node in self.nodes), default=self.lag)
+        for node in reversed(self.topological_order()):
+            node.update_backward(finish)
 
         self._critical_path = duration, path, priors = self.get_critical_path(
             as_item=True)
@@ -994,37 +1103,247 @@ class Node(object):
         self.ls = path[0].ls
         self.ef = path[-1].ef
         self.lf = path[-1].lf
+        self._floats_stale = True
+
+    def update_floats(self):
+        """
+        Computes the total float, free float and drag of all child nodes from their current times, in one pass of ProjectNetwork. Reading any of them from a child node calls this first whenever update_all or a what-if change has left them out of date. The times themselves are not changed, and while any child node has not been scheduled the floats are all None.
+        """
+        self._floats_stale = False
+        if not self.nodes:
+            return
+        if any(None in (node.es, node.ef, node.ls, node.lf) for node in self.nodes):
+            for node in self.nodes:
+                node._total_float = node._free_float = node._drag = None
+            return
+        network = ProjectNetwork.from_node(self)
+        network.es, network.ef, network.ls, network.lf = (
+            np.array(times) for times in zip(*((node.es, node.ef, node.ls, node.lf) for node in self.nodes)))
+        network.total_float = network.ls - network.es
+        network.free_float, network.drag = network.floats()
+        floats = zip(network.total_float.tolist(), network.free_float.tolist(), network.drag.tolist())
+        for node, (total_float, free_float, drag) in zip(self.nodes, floats):
+            node._total_float, node._free_float, node._drag = total_float, free_float, drag
+
+    def topological_order(self):
+        """
+        Returns the child nodes ordered so that every node comes after all of its predecessors, in time linear in the number of nodes and links.
+        """
+        in_degree = {node: 0 for node in self.nodes}
+        for node in self.nodes:
+            for to_node in node.to_nodes:
+                if to_node in in_degree and to_node is not node:
+                    in_degree[to_node] += 1
+        order = [node for node in self.nodes if in_degree[node] == 0]
+        for node in order:  # the list grows while it is scanned, as a queue
+            for to_node in node.to_nodes:
+                if to_node in in_degree and to_node is not node:
+                    in_degree[to_node] -= 1
+                    if in_degree[to_node] == 0:
+                        order.append(to_node)
+        assert len(order) == len(self.nodes), 'Network must not contain any cycles.'
+        return order
+
+    def path_key(self, node, best, positions):
+        """
+        Returns the ``(path length, number of tasks, -insertion position)`` key and the predecessor of the best path ending at a node, given the keys of its predecessors in ``best``.
+        """
+        key, predecessor = (0, 0, 0), None
+        for from_node in node.incoming_nodes:
+            if from_node in best and (predecessor is None or best[from_node][0] > key):
+                key, predecessor = best[from_node][0], from_node
+        return (key[0] + node.duration, key[1] + 1, -positions[node]), predecessor
+
+    def trace_path(self, last, best):
+        path = []
+        node = last
+        while node is not None:
+            path.append(node)
+            node = best[node][1]
+        path.reverse()
+        return best[last][0][0], path, set(path)
 
     def get_critical_path(self, as_item=False):
         """
         Finds the longest path in among the child nodes.
+
+        The path length is the sum of the task durations. It is found in one dynamic programming pass over the nodes in topological order, keeping for each node the best path ending there. Ties between paths of equal length go to the path with more tasks, then to the predecessor (or final task) added to the network first.
         """
         if self._critical_path is not None:
             # Returned cached path.
             return self._critical_path[1]
-        longest = None
-        q = [(_.duration, [_], set([_])) for _ in self.first_nodes]
-        while q:
-            item = length, path, priors = q.pop(0)
-            if longest is None:
-                longest = item
-            else:
-                try:
-                    longest = max(longest, item)
-                except TypeError:
-                    longest = longest
-            for to_node in path[-1].to_nodes:
-                if to_node in priors:
-                    continue
-                q.append((length+to_node.duration, path
-                         + [to_node], priors.union([to_node])))
-        if longest is None:
+        if not self.nodes:
             return
-        elif as_item:
+        positions = {node: position for position, node in enumerate(self.nodes)}
+        best = {}  # node -> (key, predecessor) of the best path ending at the node
+        for node in self.topological_order():
+            best[node] = self.path_key(node, best, positions)
+        longest = self.trace_path(max(best, key=lambda node: best[node][0]), best)
+        if as_item:
             return longest
         else:
             return longest[1]
 
+    def start_incremental_schedule(self):
+        """
+        Schedules all child nodes with the forward and backward passes of ProjectNetwork and keeps the state used by the what-if changes: set_duration, set_lag, add_link and remove_link. Returns the nodes whose times this changed, which the first change reports along with its own.
+        """
+        previous = {node: (node.es, node.ef, node.ls, node.lf) for node in self.nodes}
+        self._ranks = {node: rank for rank, node in enumerate(self.topological_order())}
+        self._positions = {node: position for position, node in enumerate(self.nodes)}
+        self._path_keys = {}
+        for node in sorted(self.nodes, key=self._ranks.__getitem__):
+            self._path_keys[node] = self.path_key(node, self._path_keys, self._positions)
+        ProjectNetwork.from_node(self).update_nodes(self)
+        self._finish = max((node.ef for node in self.nodes), default=self.lag)
+        self._sinks = {node for node in self.nodes if not any(to_node.parent is self for to_node in node.to_nodes)}
+        self._finish_heap = [(-node.ef, self._positions[node], node) for node in self.nodes]
+        heapq.heapify(self._finish_heap)
+        self._path_heap = [(tuple(-value for value in key), node) for node, (key, predecessor) in self._path_keys.items()]
+        heapq.heapify(self._path_heap)
+        return {node for node in self.nodes if (node.es, node.ef, node.ls, node.lf) != previous[node]}
+
+    def set_duration(self, node, duration):
+        """
+        Changes the duration of a child node and reschedules only the nodes it affects. Returns the names of the nodes whose times changed.
+        """
+        node = node if isinstance(node, Node) else self.name_to_node[node]
+        changed = self.start_incremental_schedule() if self._ranks is None else ()
+        node.duration = duration
+        return self.reschedule(forward=[node], backward=[node], changed=changed)
+
+    def set_lag(self, node, lag):
+        """
+        Changes the lag of a child node and reschedules only the nodes it affects. Returns the names of the nodes whose times changed.
+        """
+        node = node if isinstance(node, Node) else self.name_to_node[node]
+        changed = self.start_incremental_schedule() if self._ranks is None else ()
+        node.lag = lag
+        return self.reschedule(forward=[node], backward=[node] + [from_node for from_node in node.incoming_nodes if from_node.parent is self], changed=changed)
+
+    def add_link(self, from_node, to_node):
+        """
+        Links two child nodes and reschedules only the nodes the new link affects. Returns the names of the nodes whose times changed.
+        """
+        from_node = from_node if isinstance(from_node, Node) else self.name_to_node[from_node]
+        to_node = to_node if isinstance(to_node, Node) else self.name_to_node[to_node]
+        changed = self.start_incremental_schedule() if self._ranks is None else ()
+        if self._ranks[from_node] > self._ranks[to_node]:
+            self.reorder(from_node, to_node)
+        from_node.to_nodes.add(to_node)
+        to_node.incoming_nodes.add(from_node)
+        self._sinks.discard(from_node)
+        return self.reschedule(forward=[to_node], backward=[from_node], changed=changed)
+
+    def remove_link(self, from_node, to_node):
+        """
+        Removes the link between two child nodes and reschedules only the nodes it affected. Returns the names of the nodes whose times changed.
+        """
+        from_node = from_node if isinstance(from_node, Node) else self.name_to_node[from_node]
+        to_node = to_node if isinstance(to_node, Node) else self.name_to_node[to_node]
+        changed = self.start_incremental_schedule() if self._ranks is None else ()
+        from_node.to_nodes.discard(to_node)
+        to_node.incoming_nodes.discard(from_node)
+        if not any(next_node.parent is self for next_node in from_node.to_nodes):
+            self._sinks.add(from_node)
+        return self.reschedule(forward=[to_node], backward=[from_node], changed=changed)
+
+    def reorder(self, from_node, to_node):
+        """
+        Restores the topological ranks before a link from a higher ranked node to a lower ranked one is added, moving only the nodes ranked between them (Pearce and Kelly's algorithm).
+        """
+        lower, upper = self._ranks[to_node], self._ranks[from_node]
+        forward, stack = [], [to_node]
+        seen = {to_node}
+        while stack:
+            node = stack.pop()
+            forward.append(node)
+            for next_node in node.to_nodes:
+                assert next_node is not from_node, 'Network must not contain any cycles.'
+                if next_node.parent is self and next_node not in seen and self._ranks[next_node] < upper:
+                    seen.add(next_node)
+                    stack.append(next_node)
+        backward, stack = [], [from_node]
+        seen = {from_node}
+        while stack:
+            node = stack.pop()
+            backward.append(node)
+            for previous_node in node.incoming_nodes:
+                if previous_node.parent is self and previous_node not in seen and self._ranks[previous_node] > lower:
+                    seen.add(previous_node)
+                    stack.append(previous_node)
+        ranks = sorted(self._ranks[node] for node in forward + backward)
+        for node, rank in zip(sorted(backward, key=self._ranks.__getitem__) + sorted(forward, key=self._ranks.__getitem__), ranks):
+            self._ranks[node] = rank
+
+    def reschedule(self, forward=(), backward=(), changed=()):
+        """
+        Recomputes the earliest times and best paths from the ``forward`` nodes on in topological order, and the latest times from the ``backward`` nodes back in reverse order, stopping wherever the values do not change. Updates the cached critical path and returns the names of the nodes whose times changed, including the ``changed`` nodes already rescheduled by the caller.
+        """
+        changed = set(changed)
+        pending = [(self._ranks[node], node) for node in set(forward)]
+        heapq.heapify(pending)
+        queued = set(forward)
+        while pending:
+            rank, node = heapq.heappop(pending)
+            predecessors = [from_node for from_node in node.incoming_nodes if from_node.parent is self and from_node is not node]
+            es = max(from_node.ef for from_node in predecessors) + node.lag if predecessors else self.lag + node.lag
+            ef = es + node.duration
+            path_key = self.path_key(node, self._path_keys, self._positions)
+            if (es, ef) == (node._es, node._ef) and path_key == self._path_keys.get(node):
+                continue
+            if (es, ef) != (node._es, node._ef):
+                node._es, node._ef = es, ef
+                changed.add(node)
+                heapq.heappush(self._finish_heap, (-ef, self._positions[node], node))
+            if path_key != self._path_keys.get(node):
+                self._path_keys[node] = path_key
+                heapq.heappush(self._path_heap, (tuple(-value for value in path_key[0]), node))
+            for to_node in node.to_nodes:
+                if to_node.parent is self and to_node not in queued:
+                    queued.add(to_node)
+                    heapq.heappush(pending, (self._ranks[to_node], to_node))
+
+        # the project finish is the largest earliest finish; entries whose node has since changed are stale
+        while self._finish_heap[0][2]._ef != -self._finish_heap[0][0]:
+            heapq.heappop(self._finish_heap)
+        finish = -self._finish_heap[0][0]
+        backward = set(backward)
+        if finish != self._finish:
+            # every task without successors finishes no later than the project
+            backward.update(self._sinks)
+        self._finish = finish
+        pending = [(-self._ranks[node], node) for node in backward]
+        heapq.heapify(pending)
+        queued = set(backward)
+        while pending:
+            rank, node = heapq.heappop(pending)
+            successors = [to_node for to_node in node.to_nodes if to_node.parent is self and to_node is not node]
+            lf = min(to_node.ls - to_node.lag for to_node in successors) if successors else finish
+            ls = lf - node.duration
+            if (ls, lf) == (node._ls, node._lf):
+                continue
+            node._ls, node._lf = ls, lf
+            changed.add(node)
+            for from_node in node.incoming_nodes:
+                if from_node.parent is self and from_node not in queued:
+                    queued.add(from_node)
+                    heapq.heappush(pending, (-self._ranks[from_node], from_node))
+        for node in changed:
+            node._total_float = node._ls - node._es
+        # free floats and drags depend on the whole network, even where no times moved, and are recomputed when next read
+        self._floats_stale = True
+
+        while self._path_keys[self._path_heap[0][1]][0] != tuple(-value for value in self._path_heap[0][0]):
+            heapq.heappop(self._path_heap)
+        self._critical_path = duration, path, priors = self.trace_path(self._path_heap[0][1], self._path_keys)
+        self.duration = duration
+        self.es = path[0].es
+        self.ls = path[0].ls
+        self.ef = path[-1].ef
+        self.lf = path[-1].lf
+        return [node.name for node in sorted(changed, key=self._positions.__getitem__)]
+
     def print_times(self):
         w = 7
         print("""
@@ -1035,6 +1354,8 @@ class Node(object):
 |{segment}|{name}|{segment}|
 |LS={ls}|{blank}|LF={lf}|
 +{border}+
+|TF={tf}|{blank}|FF={ff}|
++{border}+
 |{blank}DRAG={drag}{blank}|
 +{border}+
 """.format(
@@ -1047,6 +1368,8 @@ class Node(object):
             name=str(self.name).center(w),
             ls=str(self.ls).ljust(w-3),
             lf=str(self.lf).ljust(w-3),
+            tf=str(self.total_float).ljust(w-3),
+            ff=str(self.free_float).ljust(w-3),
             drag=str(self.drag).ljust(w-5),
         ))
 
@@ -1085,7 +1408,280 @@ class Node(object):
         return not cyclic(g)
 
 
-def critical_path_diagram(tasks, task_dependencies, filename=None, format='svg'):
+class ProjectNetwork(object):
+    """
+    A compact, array-backed task network for critical path method (CPM) scheduling.
+
+    Durations, lags and the earliest and latest start and finish times are NumPy arrays indexed by task, and the links are held in compressed sparse row (CSR) form both by predecessor and by successor. The topological levels are found once when the network is built, and the forward and backward passes then run one vectorized step per level. The latest finish of every task without successors is the project finish. The total float, free float and drag of every task follow from the two passes in one more vectorized pass.
+
+    Parameters
+    ----------
+    names : list of strings
+        The task names.
+    durations : list of numbers
+        The duration of each task.
+    links : list of tuples, optional
+        The ``(predecessor, successor)`` task name pairs.
+    lags : list of numbers, optional
+        The time each task waits after its latest predecessor finishes before it starts. Defaults to zero.
+    start : number, optional
+        The start time of the tasks without predecessors, plus their lags. The default is 0.
+
+    """
+
+    def __init__(self, names, durations, links=(), lags=None, start=0):
+        self.names = list(names)
+        self.index = {name: position for position, name in enumerate(self.names)}
+        self.durations = np.asarray(durations)
+        self.lags = np.zeros_like(self.durations) if lags is None else np.asarray(lags)
+        self.start = start
+        size = len(self.names)
+        pairs = [(self.index[from_name], self.index[to_name]) for from_name, to_name in links if from_name != to_name]
+        pairs = np.array(sorted(set(pairs)), dtype=np.intp).reshape(-1, 2)
+        self.sources, self.targets = pairs[:, 0], pairs[:, 1]
+        self.successor_offsets = np.concatenate(([0], np.cumsum(np.bincount(self.sources, minlength=size)))).astype(np.intp)
+        self.successor_ids = self.targets  # the pairs are sorted by predecessor
+        by_target = np.lexsort((self.sources, self.targets))
+        self.predecessor_offsets = np.concatenate(([0], np.cumsum(np.bincount(self.targets, minlength=size)))).astype(np.intp)
+        self.predecessor_ids = self.sources[by_target]
+
+        # Kahn's algorithm one frontier at a time: a task's frontier is its level, one more than its deepest predecessor
+        self.levels = np.zeros(size, dtype=np.intp)
+        in_degree = np.diff(self.predecessor_offsets).copy()
+        frontier = np.flatnonzero(in_degree == 0)
+        order = []
+        level = 0
+        while frontier.size:
+            order.append(frontier)
+            self.levels[frontier] = level
+            successors, counts = np.unique(self.successor_ids[csr_row_positions(self.successor_offsets, frontier)], return_counts=True)
+            in_degree[successors] -= counts
+            frontier = successors[in_degree[successors] == 0]
+            level += 1
+        self.order = np.concatenate(order) if order else np.zeros(0, dtype=np.intp)
+        assert len(self.order) == size, 'Network must not contain any cycles.'
+        self.level_count = level
+        self.level_offsets = np.concatenate(([0], np.cumsum([len(tasks) for tasks in order]))).astype(np.intp)
+
+        # per level, the links into its tasks grouped by successor (forward pass) and out of its tasks grouped by predecessor (backward pass)
+        forward = np.lexsort((self.sources, self.targets, self.levels[self.targets]))
+        forward_offsets = np.searchsorted(self.levels[self.targets[forward]], np.arange(level + 1))
+        backward = np.lexsort((self.targets, self.sources, self.levels[self.sources]))
+        backward_offsets = np.searchsorted(self.levels[self.sources[backward]], np.arange(level + 1))
+        self.forward_steps = []
+        self.backward_steps = []
+        for step in range(level):
+            tasks = self.order[self.level_offsets[step]:self.level_offsets[step + 1]]
+            links = forward[forward_offsets[step]:forward_offsets[step + 1]]
+            targets = self.targets[links]
+            segments = np.flatnonzero(np.r_[True, targets[1:] != targets[:-1]]) if links.size else links
+            self.forward_steps.append((tasks, self.sources[links], segments, targets[segments]))
+            links = backward[backward_offsets[step]:backward_offsets[step + 1]]
+            sources = self.sources[links]
+            segments = np.flatnonzero(np.r_[True, sources[1:] != sources[:-1]]) if links.size else links
+            self.backward_steps.append((tasks, self.targets[links], segments, sources[segments]))
+
+        self.es = self.ef = self.ls = self.lf = self.total_float = self.free_float = self.drag = None
+
+    @classmethod
+    def from_tasks(cls, tasks, task_dependencies):
+        """
+        Returns the network of the tasks and dependencies in the form taken by ``critical_path_diagram``.
+        """
+        return cls([task[0] for task in tasks], [task[1]["Duration"] for task in tasks], task_dependencies,
+                   lags=[task[1].get("Lag", 0) for task in tasks])
+
+    @classmethod
+    def from_node(cls, project):
+        """
+        Returns the network of the child nodes of a Node and their links.
+        """
+        children = set(project.nodes)
+        links = [(node.name, to_node.name) for node in project.nodes for to_node in node.to_nodes if to_node in children]
+        return cls([node.name for node in project.nodes], [node.duration for node in project.nodes], links,
+                   lags=[node.lag for node in project.nodes], start=project.lag)
+
+    def passes(self, durations):
+        """
+        Runs the forward and backward passes for an array of task durations and returns the ``es``, ``ef``, ``ls`` and ``lf`` arrays.
+
+        The durations may have extra trailing dimensions, such as one column per Monte Carlo sample, and every sample is then scheduled in the same vectorized steps. The latest finish of a task without successors is the project finish of its own sample.
+        """
+        durations = np.asarray(durations)
+        lags = self.lags.reshape(self.lags.shape + (1,) * (durations.ndim - 1))
+        es = np.zeros(durations.shape, dtype=np.result_type(durations, lags, self.start))
+        ef = np.zeros_like(es)
+        for tasks, link_sources, segments, targets in self.forward_steps:
+            if link_sources.size:
+                es[targets] = np.maximum.reduceat(ef[link_sources], segments) + lags[targets]
+            else:
+                es[tasks] = self.start + lags[tasks]
+            ef[tasks] = es[tasks] + durations[tasks]
+
+        lf = np.empty_like(es)
+        lf[...] = ef.max(axis=0) if len(self.names) else self.start
+        ls = np.zeros_like(es)
+        for tasks, link_targets, segments, sources in reversed(self.backward_steps):
+            if link_targets.size:
+                lf[sources] = np.minimum.reduceat(ls[link_targets] - lags[link_targets], segments)
+            ls[tasks] = lf[tasks] - durations[tasks]
+        return es, ef, ls, lf
+
+    def schedule(self):
+        """
+        Runs the forward and backward passes and returns the network, with the ``es``, ``ef``, ``ls``, ``lf``, ``total_float``, ``free_float`` and ``drag`` arrays filled in.
+        """
+        self.es, self.ef, self.ls, self.lf = self.passes(self.durations)
+        self.total_float = self.ls - self.es
+        self.free_float, self.drag = self.floats()
+        return self
+
+    def floats(self):
+        """
+        Returns the free float and drag arrays of the scheduled tasks, without rescheduling.
+
+        The free float of a task is the time it can slip without delaying the earliest start of any successor, or the project finish if it has none. The drag of a task is how much sooner the project would finish if the task took no time. A path that avoids a task either jumps over its position in the topological order by one link, ends before it or begins after it, so the longest path avoiding each task is a maximum over position ranges, found for all tasks at once by ``interval_cover_maximum``. The drag of a critical task is then the smaller of its duration and the project finish less that longest path, and zero for any other task.
+        """
+        size = len(self.names)
+        finish = self.finish
+        free_float = finish - self.ef
+        rows = np.flatnonzero(np.diff(self.successor_offsets))
+        if rows.size:
+            successors = self.successor_ids
+            free_float[rows] = np.minimum.reduceat(self.es[successors] - self.lags[successors], self.successor_offsets[rows]) - self.ef[rows]
+
+        ranks = np.empty(size, dtype=np.intp)
+        ranks[self.order] = np.arange(size)
+        longest = finish - self.total_float  # the longest path through each task
+        sinks = np.flatnonzero(np.diff(self.successor_offsets) == 0)
+        sources = np.flatnonzero(np.diff(self.predecessor_offsets) == 0)
+        lows = np.concatenate((ranks[self.sources] + 1, ranks[sinks] + 1, np.zeros(len(sources), dtype=np.intp)))
+        highs = np.concatenate((ranks[self.targets] - 1, np.full(len(sinks), size - 1, dtype=np.intp), ranks[sources] - 1))
+        values = np.concatenate((self.ef[self.sources] + self.lags[self.targets] + finish - self.ls[self.targets], longest[sinks], longest[sources]))
+        avoiding = interval_cover_maximum(size, lows, highs, values)[ranks]
+        critical = self.total_float <= 1e-9 * max(1.0, abs(finish))
+        drag = np.where(critical, np.maximum(np.minimum(self.durations, finish - avoiding), 0), 0)
+        return free_float, drag.astype(np.result_type(self.es, self.durations, self.lags))
+
+    @property
+    def finish(self):
+        """The project finish, the latest earliest finish of any task."""
+        return self.ef.max() if len(self.names) else self.start
+
+    def critical_path(self):
+        """
+        Returns the task indices of the longest path by total duration, chosen as by ``Node.get_critical_path``: ties go to the path with more tasks, then to the task listed first.
+        """
+        if not len(self.names):
+            return []
+        durations = self.durations.tolist()
+        offsets, predecessors = self.predecessor_offsets.tolist(), self.predecessor_ids.tolist()
+        keys = [None] * len(self.names)
+        previous = [-1] * len(self.names)
+        for task in self.order.tolist():
+            key = (0, 0, 0)
+            for predecessor in predecessors[offsets[task]:offsets[task + 1]]:
+                if previous[task] < 0 or keys[predecessor] > key:
+                    key, previous[task] = keys[predecessor], predecessor
+            keys[task] = (key[0] + durations[task], key[1] + 1, -task)
+        task = max(range(len(self.names)), key=keys.__getitem__)
+        path = []
+        while task >= 0:
+            path.append(task)
+            task = previous[task]
+        return path[::-1]
+
+    def update_nodes(self, project):
+        """
+        Schedules the network if needed and writes the times, floats, drags and critical path back to the child nodes of a Node, as ``Node.update_all`` does.
+        """
+        if self.es is None:
+            self.schedule()
+        times = zip(self.es.tolist(), self.ef.tolist(), self.ls.tolist(), self.lf.tolist(),
+                    self.total_float.tolist(), self.free_float.tolist(), self.drag.tolist())
+        for name, (es, ef, ls, lf, total_float, free_float, drag) in zip(self.names, times):
+            node = project.name_to_node[name]
+            # set the private fields, since the es setter would queue the node for another update_all pass
+            node._es, node._ef, node._ls, node._lf = es, ef, ls, lf
+            node._total_float, node._free_float, node._drag = total_float, free_float, drag
+        project.forward_pending.clear()
+        project.backward_pending.clear()
+        project._floats_stale = False
+        path = [project.name_to_node[self.names[task]] for task in self.critical_path()]
+        if path:
+            project._critical_path = duration, path, priors = sum(node.duration for node in path), path, set(path)
+            project.duration = duration
+            project.es = path[0].es
+            project.ls = path[0].ls
+            project.ef = path[-1].ef
+            project.lf = path[-1].lf
+        return project
+
+    def table(self):
+        """
+        Returns the schedule as a DataFrame indexed by task, with the duration, earliest and latest start and finish, total float, free float and drag of each task and whether it is on the critical path.
+        """
+        if self.es is None:
+            self.schedule()
+        critical = np.zeros(len(self.names), dtype=bool)
+        critical[self.critical_path()] = True
+        return pd.DataFrame({'Duration': self.durations, 'ES': self.es, 'EF': self.ef, 'LS': self.ls, 'LF': self.lf,
+                             'Total Float': self.total_float, 'Free Float': self.free_float, 'Drag': self.drag,
+                             'Critical': critical}, index=pd.Index(self.names, name='Task'))
+
+    def to_node(self, name=''):
+        """
+        Returns a new Node holding the tasks of the network as scheduled child nodes.
+        """
+        project = Node(name, lag=self.start)
+        for task, task_name in enumerate(self.names):
+            project.add(Node(task_name, duration=self.durations[task].item(), lag=self.lags[task].item()))
+        for source, target in zip(self.sources.tolist(), self.targets.tolist()):
+            project.link(self.names[source], self.names[target])
+        return self.update_nodes(project)
+
+
+def csr_row_positions(offsets, rows):
+    """
+    Returns the positions in a CSR index array of all the entries of the given rows, in row order.
+    """
+    starts, ends = offsets[rows], offsets[rows + 1]
+    counts = ends - starts
+    if not counts.sum():
+        return np.zeros(0, dtype=np.intp)
+    return np.repeat(starts - np.concatenate(([0], np.cumsum(counts)[:-1])), counts) + np.arange(counts.sum())
+
+
+def interval_cover_maximum(size, lows, highs, values):
+    """
+    Returns for each position below ``size`` the largest value whose closed interval ``[low, high]`` covers it, or ``-inf`` where no interval does.
+
+    Each interval is written as two overlapping power-of-two blocks, as in a sparse table, and the blocks are then split in half level by level down to single positions.
+    """
+    cover = np.full(size, -np.inf)
+    keep = lows <= highs
+    lows, highs, values = lows[keep], highs[keep], np.asarray(values, dtype=float)[keep]
+    if not lows.size:
+        return cover
+    levels = np.frexp(highs - lows + 1)[1] - 1  # the largest power of two within each interval
+    table = np.full((levels.max() + 1, size), -np.inf)
+    np.maximum.at(table, (levels, lows), values)
+    np.maximum.at(table, (levels, highs - np.left_shift(1, levels) + 1), values)
+    for level in range(len(table) - 1, 0, -1):
+        half = 1 << (level - 1)
+        np.maximum(table[level - 1], table[level], out=table[level - 1])
+        np.maximum(table[level - 1][half:], table[level][:-half], out=table[level - 1][half:])
+    return table[0]
+
+
+def schedule_table(tasks, task_dependencies):
+    """
+    Returns the critical path schedule of the tasks as a DataFrame indexed by task, with the earliest and latest start and finish, total float, free float and drag of each task, in the input form taken by ``critical_path_diagram``.
+    """
+    return ProjectNetwork.from_tasks(tasks, task_dependencies).schedule().table()
+
+
+def critical_path_diagram(tasks, task_dependencies, filename=None, format='svg', criticality=None, floats=False):
     """
     Compute and draw the critical path between dependent tasks as the longest in duration from start to finish.
 
@@ -1099,6 +1695,10 @@ def critical_path_diagram(tasks, task_dependencies, filename=None, format='svg')
         A filename for the output not including a filename extension. The extension will specified by the format parameter.
     format : string, optional
         The file format of the graphic output. Note that bitmap formats (png, bmp, or jpeg) will not be as sharp as the default svg vector format and most particularly when magnified.
+    criticality : dictionary, optional
+        Criticality indices keyed by task name, such as the ``'criticality'`` returned by ``schedule_risk``. Each task is then labeled with its index and shaded from white (never critical) to red (always critical).
+    floats : boolean, optional
+        Label each task with its total float, free float and drag.
 
     Returns
     -------
@@ -1119,7 +1719,7 @@ def critical_path_diagram(tasks, task_dependencies, filename=None, format='svg')
      for task in tasks]
     [project.link(dependency[0], dependency[1])
      for dependency in task_dependencies]
-    project.update_all()
+    ProjectNetwork.from_node(project).update_nodes(project)
 
     crit_path = [str(n) for n in project.get_critical_path()]
     critical_edges = [(n, crit_path[i+1])
@@ -1128,8 +1728,16 @@ def critical_path_diagram(tasks, task_dependencies, filename=None, format='svg')
         list(set(critical_edges) - set(task_dependencies))
 
     for task in tasks:
-        critical_path.node(task[0], label=task[0]
-                           + ', ' + str(task[1]['Duration']))
+        label = task[0] + ', ' + str(task[1]['Duration'])
+        if floats:
+            node = project.lookup_node(task[0])
+            label += f'\\nTF={node.total_float} FF={node.free_float} DRAG={node.drag}'
+        if criticality is None:
+            critical_path.node(task[0], label=label)
+        else:
+            index = criticality.get(task[0], 0.0)
+            critical_path.node(task[0], label=label + f'\\nCI={index:.2f}',
+                               style='filled', fillcolor=f'0.000 {index:.3f} 1.000')
 
     for edge in non_critical_edges:
         critical_path.edge(edge[0], edge[1])
@@ -1149,73 +1757,179 @@ def critical_path_diagram(tasks, task_dependencies, filename=None, format='svg')
     # return True
 
 
-# determine fault tree node levels and assign them in dictionary
-def assign_levels(events_quant_dict, event, level):
-    for branch in events_quant_dict[event]['branches']:
-        events_quant_dict[branch]['level'] = level + 1
-        assign_levels(events_quant_dict, branch, level + 1)
+def schedule_risk_block(network, distributions, samples, seed, latin_hypercube=False):
+    """
+    Samples one block of task durations and returns the project finish of every sample and the number of samples in which each task is critical. This is the unit of work sent to each worker process.
+    """
+    rng = np.random.default_rng(seed)
+    durations = sample_basic_events(distributions, samples, rng, latin_hypercube)
+    es, ef, ls, lf = network.passes(durations)
+    finish = ef.max(axis=0)
+    tolerance = 1e-9 * np.maximum(1.0, np.abs(finish))
+    return finish, (ls - es <= tolerance).sum(axis=1)
 
 
-def draw_fault_tree_diagram_quantitative(ft, filename=None, format='svg'):
+def schedule_risk(tasks, task_dependencies, distributions=None, samples=10000, seed=None, latin_hypercube=False, workers=None, percentiles=(5, 50, 95), bins=50, block_size=1000):
+    """
+    Propagates task duration uncertainty to the project finish by Monte Carlo sampling.
 
-    or_nodes = ['Or', 'or', 'OR']
-    and_nodes = ['And', 'and', 'AND']
-    basic_nodes = ['Basic', 'basic', 'BASIC']
-    prob_string = lambda event_name, probability : f"<br/>p={events_quant_dict[event_name]['prob']:.1e}" if (probability<.001) else f"<br/>p={events_quant_dict[event_name]['prob']:.3f}".rstrip('0')
+    All samples of a block are scheduled together by the vectorized forward and backward passes of ProjectNetwork. A task is critical in a sample when its total float is zero, and its criticality index is the fraction of samples in which it is critical.
 
-    # convert fault tree input to dictionary
-    top_name, top_condition, top_branches = ft[0][0], ft[0][1], ft[0][3]
-    events_quant_dict = {top_name: {'type': top_condition, 'prob': '', 'state': False , 'branches' : top_branches}} # calculate this
-    events_quant_dict.update({event[0]:{'type': event[1],'prob': event[2], 'state': False, 'branches' : []} for event in ft if event[1] in basic_nodes})
-    events_quant_dict.update({event[0]:{'type': event[1], 'prob': '', 'state': True, 'branches' : event[3]} for event in ft if event[1] in and_nodes}) # default True until False found
-    events_quant_dict.update({event[0]:{'type': event[1], 'prob': '', 'state': False, 'branches' : event[3]} for event in ft if event[1] in or_nodes}) # default False until True found
-
-    root_event = list(events_quant_dict.keys())[0]
-    events_quant_dict[root_event]['level'] = 1
-    assign_levels(events_quant_dict, root_event, 1)
-
-    # compute probabilities and states
-    max_level = max([events_quant_dict[event]['level'] for event in events_quant_dict])
-    for level in range(max_level, 0, -1):
-        for event in events_quant_dict:
-            if events_quant_dict[event]['level'] == level:
-                # ands
-                 if events_quant_dict[event]['type'] in and_nodes:
-                     probability = 1
-                     events_quant_dict[event]['state'] = True  # default True until False found
-                     for basic_event in events_quant_dict[event]['branches']: # the branches
-                         if events_quant_dict[basic_event]['state'] is False:
-                             events_quant_dict[event]['state'] = False
-                         probability *= events_quant_dict[basic_event]['prob']
-                     events_quant_dict[event]['prob'] = probability
-                # ors
-                 if events_quant_dict[event]['type'] in or_nodes:
-                     probability = 0
-                     events_quant_dict[event]['state'] = False  # default False until True found
-                     for basic_event in events_quant_dict[event]['branches']: # the branches
-                         if events_quant_dict[basic_event]['state'] is True:
-                             events_quant_dict[event]['state'] = True
-                         probability += events_quant_dict[basic_event]['prob']
-                     events_quant_dict[event]['prob'] = probability
+    Parameters
+    ----------
+    tasks : list of tuples
+        The tasks in the form taken by ``critical_path_diagram``. Tasks without a distribution keep their "Duration".
+    task_dependencies : list of tuples
+        The ``(predecessor, successor)`` task pairs in the form taken by ``critical_path_diagram``.
+    distributions : dictionary, optional
+        Task duration distributions keyed by task name, each given as ``("triangular", low, most likely, high)``, ``("pert", low, most likely, high)``, ``("uniform", low, high)`` or a fixed duration.
+    samples : int, optional
+        The number of samples. The default is 10000.
+    seed : int, optional
+        A seed for reproducible results. Samples are drawn in blocks of ``block_size`` with one random stream per block, so the result for a seed is the same for any number of workers.
+    latin_hypercube : boolean, optional
+        Use Latin hypercube sampling within each block instead of simple random sampling.
+    workers : int, optional
+        The number of worker processes to sample the blocks in parallel.
+    percentiles : tuple of numbers, optional
+        The percentiles of the project finish to report. The default is (5, 50, 95).
+    bins : int, optional
+        The number of histogram bins. The default is 50.
+    block_size : int, optional
+        The number of samples scheduled as one vectorized block. Each block holds four arrays of (tasks x block_size) times.
 
-    # make labels with probabilities by renaming nodes
-    events_quant_dict_labeled = {event+prob_string(event, events_quant_dict[event]['prob']): {'type': events_quant_dict[event]['type'], 'prob': events_quant_dict[event]['prob'], 'state': events_quant_dict[event]['state'], 'branches': events_quant_dict[event]['branches']} for event in events_quant_dict}
+    Returns
+    -------
+    results : dictionary
+        The ``'mean'``, ``'std'``, a dictionary of ``'percentiles'`` and the ``'histogram'`` as a tuple of counts and bin edges of the project finish, the finish ``'samples'``, and the ``'criticality'`` index of each task keyed by task name. The criticality can be drawn with ``critical_path_diagram(tasks, task_dependencies, criticality=results['criticality'])``.
 
-    for event in events_quant_dict:
-        for index, branch in enumerate(events_quant_dict[event]['branches']):
-            branch_label = branch+prob_string(branch, events_quant_dict[branch]['prob'])
-            events_quant_dict_labeled[event+prob_string(event, events_quant_dict[event]['prob'])]['branches'][index] = branch_label
+    """
+    network = ProjectNetwork.from_tasks(tasks, task_dependencies)
+    merged = {task[0]: task[1]["Duration"] for task in tasks}
+    if distributions is not None:
+        unknown = [name for name in distributions if name not in merged]
+        if unknown:
+            raise ErrorMsg(f"Exception: Distributions given for unknown tasks {unknown}")
+        merged.update(distributions)
+    task_distributions = [merged[name] for name in network.names]
+
+    block_sizes = [block_size] * (samples // block_size) + ([samples % block_size] if samples % block_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(block_sizes))
+    if workers is not None and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(schedule_risk_block, network, task_distributions, size, block_seed, latin_hypercube) for size, block_seed in zip(block_sizes, seeds)]
+            blocks = [future.result() for future in futures]
+    else:
+        blocks = [schedule_risk_block(network, task_distributions, size, block_seed, latin_hypercube) for size, block_seed in zip(block_sizes, seeds)]
+    finish = np.concatenate([block[0] for block in blocks])
+    critical_counts = np.sum([block[1] for block in blocks], axis=0)
 
-    simple_ft_quantititive = [(event, events_quant_dict_labeled[event]['type'], events_quant_dict_labeled[event]['branches']) for event in events_quant_dict_labeled]
+    return {'mean': finish.mean(),
+            'std': finish.std(),
+            'percentiles': dict(zip(percentiles, np.percentile(finish, percentiles))),
+            'histogram': np.histogram(finish, bins=bins),
+            'samples': finish,
+            'criticality': dict(zip(network.names, (critical_counts / samples).tolist()))}
 
-    return(fault_tree_diagram(simple_ft_quantititive, filename=filename, format=format))
 
-def fault_tree_cutsets(fault_tree):
-    """ Returns a fault tree cutset.
+# determine fault tree node levels and assign them in dictionary
+def assign_levels(events_quant_dict, event, level):
+    for branch in events_quant_dict[event]['branches']:
+        events_quant_dict[branch]['level'] = level + 1
+        assign_levels(events_quant_dict, branch, level + 1)
+
+
+def draw_fault_tree_diagram_quantitative(ft, filename=None, format='svg', modularize=False, normalize=False):
+    """ Returns a fault tree diagram labeled with event probabilities.
+
+    Parameters
+    ----------
+    ft : list of tuples or FaultTree
+        A list of the faults as a tree hierarchy in the form taken by ``fault_tree_diagram``, except that each event tuple also holds its probability before its branches in the form ``("fault name", "fault type", probability, list of fault branches)``. Probabilities are given for the basic events and are computed for the others. A compiled ``FaultTree`` of the list may be given instead.
+    filename : string, optional
+        A filename for the output not including a filename extension. The extension will specified by the format parameter.
+    format : string, optional
+        The file format of the graphic output. Note that bitmap formats (png, bmp, or jpeg) will not be as sharp as the default svg vector format and most particularly when magnified.
+    modularize : boolean, optional
+        Compute exact gate probabilities by splitting the tree into independent modules and evaluating each module on its own binary decision diagram. By default "and" gates multiply and "or" gates add their branch probabilities (the rare event approximation).
+    normalize : boolean, optional
+        Quantify and draw the smaller equivalent tree produced by ``normalize_fault_tree``.
+
+    Returns
+    -------
+    g : graph object view
+        Save the graph source code to file, and open the rendered result in its default viewing application. PyML calls the Graphviz API for this.
+
+    """
+    if normalize:
+        ft = normalize_fault_tree(ft)
+
+    tree = as_fault_tree(ft)
+
+    # convert fault tree input to dictionary, top event first
+    events_quant_dict = {}
+    for node in reversed(tree.order):
+        events_quant_dict[tree.names[node]] = {'type': tree.types[node], 'prob': tree.probabilities[node] if tree.types[node] == 'basic' else '', 'state': tree.types[node] == 'and', 'branches': [tree.names[child] for child in tree.children(node)]} # ands default True until False found, others False until True found
+
+    # compute probabilities and states in topological order, children before parents
+    for node in tree.order:
+        event = tree.names[node]
+        branches = events_quant_dict[event]['branches']
+        # ands
+        if events_quant_dict[event]['type'] == 'and':
+            probability = 1
+            events_quant_dict[event]['state'] = True  # default True until False found
+            for basic_event in branches: # the branches
+                if events_quant_dict[basic_event]['state'] is False:
+                    events_quant_dict[event]['state'] = False
+                probability *= events_quant_dict[basic_event]['prob']
+            events_quant_dict[event]['prob'] = probability
+        # ors
+        if events_quant_dict[event]['type'] == 'or':
+            probability = 0
+            events_quant_dict[event]['state'] = False  # default False until True found
+            for basic_event in branches: # the branches
+                if events_quant_dict[basic_event]['state'] is True:
+                    events_quant_dict[event]['state'] = True
+                probability += events_quant_dict[basic_event]['prob']
+            events_quant_dict[event]['prob'] = probability
+        # votes
+        k = tree.thresholds[node]
+        if k is not None:
+            events_quant_dict[event]['state'] = sum(events_quant_dict[branch]['state'] is True for branch in branches) >= k
+            events_quant_dict[event]['prob'] = voting_probability([events_quant_dict[branch]['prob'] for branch in branches], k)
+
+    if modularize:
+        for event, probability in modular_gate_probabilities(tree).items():
+            events_quant_dict[event]['prob'] = probability
+
+    return labeled_fault_tree_diagram(events_quant_dict, filename=filename, format=format)
+
+
+def labeled_fault_tree_diagram(events_quant_dict, filename=None, format='svg'):
+    """
+    Draws a fault tree from a dictionary of events keyed by name with their 'type', 'prob' and 'branches', labeling every event with its probability.
+    """
+    prob_string = lambda event_name, probability : f"<br/>p={events_quant_dict[event_name]['prob']:.1e}" if (probability<.001) else f"<br/>p={events_quant_dict[event_name]['prob']:.3f}".rstrip('0')
+
+    # make labels with probabilities by renaming nodes
+    events_quant_dict_labeled = {event+prob_string(event, events_quant_dict[event]['prob']): {'type': events_quant_dict[event]['type'], 'prob': events_quant_dict[event]['prob'], 'branches': list(events_quant_dict[event]['branches'])} for event in events_quant_dict}
+
+    for event in events_quant_dict:
+        for index, branch in enumerate(events_quant_dict[event]['branches']):
+            branch_label = branch+prob_string(branch, events_quant_dict[branch]['prob'])
+            events_quant_dict_labeled[event+prob_string(event, events_quant_dict[event]['prob'])]['branches'][index] = branch_label
+
+    simple_ft_quantititive = [(event, events_quant_dict_labeled[event]['type'], events_quant_dict_labeled[event]['branches']) for event in events_quant_dict_labeled]
+
+    return(fault_tree_diagram(simple_ft_quantititive, filename=filename, format=format))
+
+def fault_tree_cutsets(fault_tree, engine='bitset', max_order=None, cutoff=None, probabilities=None, workers=None, print_cutsets=True, return_cutsets=False, modularize=False, normalize=False, cache=None, memory_limit=None):
+    """ Returns a fault tree cutset.
 
     Parameters
     ----------
-    ft : list of tuples
+    ft : list of tuples or FaultTree
         A list of the faults as a tree hierarchy. Each fault is defined in a tuple containing the fault name, type, and underlying faults (if any) in the form
         ``("fault name", "fault name", list of fault branches)``
         with the branches as a list in the form
@@ -1227,23 +1941,59 @@ def fault_tree_cutsets(fault_tree):
 
         And: "And" "and" "AND" \n
         Or: "Or" "or" "OR" \n
-        Basic: "Basic" "basic" "BASIC"
+        Basic: "Basic" "basic" "BASIC" \n
+        Vote: "Vote k" "KofN k" for a gate that occurs when at least k of its branches occur
 
     filename : string, optional
         A filename for the output not including a filename extension. The extension will specified by the format parameter.
     format : string, optional
         The file format of the graphic output. Note that bitmap formats (png, bmp, or jpeg) will not be as sharp as the default svg vector format and most particularly when magnified.
+    engine : string, optional
+        The cutset generation engine. The default ``engine='bitset'`` interns basic events as integer bits and expands gates from a worklist, which scales to hundreds of thousands of cutsets. ``engine='list'`` runs the original list-rewriting MOCUS and ``engine='bdd'`` reads the minimal cutsets from a zero-suppressed binary decision diagram, which is fastest on trees with heavy event sharing.
+    max_order : int, optional
+        The largest number of events allowed in a cutset. Larger partial cutsets are dropped during expansion.
+    cutoff : float, optional
+        The smallest cutset probability kept. Less probable partial cutsets are dropped during expansion. The basic event probabilities are read from a quantitative fault tree in the form used by ``draw_fault_tree_diagram_quantitative``.
+    probabilities : dictionary, optional
+        Basic event probabilities keyed by event name, used instead of the probabilities in the fault tree.
+    workers : int, optional
+        The number of worker processes to expand the cutsets in parallel. The result is identical to the serial expansion.
+    print_cutsets : boolean, optional
+        Print the numbered cutsets. The default is True.
+    return_cutsets : boolean, optional
+        Return the cutsets. The default is False. Use ``iter_cutsets`` to stream the cutsets of very large trees instead.
+    modularize : boolean, optional
+        Solve the independent sub-trees (modules) of the fault tree separately and combine their cutsets at the end.
+    normalize : boolean, optional
+        Reduce the fault tree with ``normalize_fault_tree`` before generating the cutsets.
+    cache : CutsetCache, optional
+        A cache of module cutsets keyed by canonical sub-tree hashes, reused across calls and, with an on-disk store, across sessions.
+    memory_limit : int, optional
+        The approximate number of bytes of partial cutsets held in memory. Rows beyond the limit are spilled to temporary files on disk and merged at the end.
 
     Returns
     -------
     cutsets : list of lists
-        Returns a list of cutsets, where each is defined as a list of events.
+        If ``return_cutsets=True``, returns a list of cutsets, where each is defined as a list of events.
 
     """
-    cutsets = mocus(fault_tree)
-    print("Minimal Cutsets:\nNumber  Event List")
-    for num, cutset in enumerate(cutsets):
-        print(num+1,'  ', cutset)
+    if normalize:
+        fault_tree = normalize_fault_tree(fault_tree, verbose=print_cutsets)
+    truncated = max_order is not None or cutoff is not None
+    if engine == 'bitset' and workers is None and not truncated and not return_cutsets and not modularize and cache is None and memory_limit is None:
+        cutsets = iter_cutsets(fault_tree)  # stream rather than hold the full list only to print it
+    else:
+        cutsets = mocus(fault_tree, engine=engine, max_order=max_order, cutoff=cutoff, probabilities=probabilities, workers=workers, modularize=modularize, cache=cache, memory_limit=memory_limit)
+    if print_cutsets:
+        print("Minimal Cutsets:\nNumber  Event List")
+        for num, cutset in enumerate(cutsets):
+            print(num+1,'  ', cutset)
+        if truncated and cutsets.truncated_probability is None:
+            print(f"Truncated {cutsets.truncated_rows} partial cutsets")
+        elif truncated:
+            print(f"Truncated {cutsets.truncated_rows} partial cutsets with probability mass {cutsets.truncated_probability:.3e}")
+    if return_cutsets:
+        return cutsets
 
 import os
 import itertools
@@ -1330,8 +2080,6 @@ def find_element_to_expand(paths, d):
 
 
 def mocus_init(ft):
-    global copy
-    copy = ft
     ft  = [event for event in ft if event[1] != 'basic' if event[1] != 'Basic' if event[1] != 'BASIC']
     top_name = ft[0][0]
     dic_ft = dict([(k, [v, w]) for k, v, w in ft])
@@ -1350,21 +2098,2381 @@ def mocus_init(ft):
             break
     return(ps)
 
-def mocus(fault_tree):
+def mocus(fault_tree, engine='bitset', max_order=None, cutoff=None, probabilities=None, workers=None, modularize=False, normalize=False, cache=None, memory_limit=None):
+    """
+    Returns the minimal cutsets of a fault tree as a list of event lists sorted by order.
+
+    ``max_order`` drops cutsets with more events than the limit and ``cutoff`` drops cutsets less probable than the limit, both while the rows are still being expanded. Probabilities are taken from the basic events of a quantitative fault tree in the form used by draw_fault_tree_diagram_quantitative, or from an optional ``probabilities`` dictionary of basic event names. The returned CutsetList reports the truncated rows and probability mass.
 
+    With ``workers`` greater than one the partially expanded rows are split by their "or" alternatives into partitions that are expanded and locally minimized in a process pool, then merged and minimized again, giving exactly the same cutsets as the serial expansion. On platforms that start worker processes by spawning, call it from under an ``if __name__ == '__main__':`` guard.
+
+    With ``modularize=True`` the independent modules found by find_modules are solved one at a time and their cutsets substituted at the end. Truncation, workers and modularization require the bitset engine. With ``normalize=True`` the tree is first reduced by normalize_fault_tree.
+
+    With ``memory_limit`` in bytes the partial rows and cutsets that outgrow the budget are spilled to binary files in the system temporary directory and merged at the end, so trees whose expansion does not fit in memory still complete.
+
+    With a CutsetCache as ``cache`` the tree is normalized and modularized, and the cutsets of every module already in the cache are reused; the result is sorted for the original tree.
+    """
+    if cache is not None:
+        if engine != 'bitset':
+            raise ErrorMsg("Exception: Cutset caching requires engine='bitset'")
+        cutsets = mocus_modular(normalize_fault_tree(fault_tree), max_order=max_order, cutoff=cutoff, probabilities=probabilities, workers=workers, cache=cache, memory_limit=memory_limit)
+        return CutsetList(sort_cutsets(cutsets, fault_tree), cutsets.truncated_rows, cutsets.truncated_probability)
+    if normalize:
+        fault_tree = normalize_fault_tree(fault_tree)
+    if engine == 'bitset':
+        if modularize:
+            return mocus_modular(fault_tree, max_order=max_order, cutoff=cutoff, probabilities=probabilities, workers=workers, memory_limit=memory_limit)
+        return mocus_bitset(fault_tree, max_order=max_order, cutoff=cutoff, probabilities=probabilities, workers=workers, memory_limit=memory_limit)
+    if engine not in ('list', 'bdd'):
+        raise ErrorMsg(f"Exception: Unknown cutset engine {engine}")
+    if max_order is not None or cutoff is not None or workers is not None or modularize or memory_limit is not None:
+        raise ErrorMsg("Exception: Cutset truncation, workers, memory_limit and modularize require engine='bitset'")
+    if engine == 'bdd':
+        return CutsetList(fault_tree_bdd(fault_tree).minimal_cutsets())
+    if any(vote_threshold(event[1]) is not None for event in fault_tree):
+        raise ErrorMsg("Exception: Voting gates require engine='bitset' or engine='bdd'")
     verbose = False
-    fault_tree_copy = deepcopy(fault_tree) # to avoid top row "and" rewrite in cs_helper
+    fault_tree_copy = deepcopy(list(fault_tree)) # to avoid top row "and" rewrite in cs_helper
     cs = []
     cs = mocus_init(fault_tree_copy)
-    css = list(map(lambda x: list(set(x)), cs))
-    css.sort(key=len)
-    for a, b in itertools.combinations(css, 2):
-        if verbose: print(set(a), set(b)) # rm
-        if set(a) <= set(b):
-            try:
-                css.remove(b)
-            except BaseException:
-                continue
+    css = minimize_cutsets(cs)
     if verbose: print(f'***{css=}') # rm
-    ft = copy
     return(css)
+
+
+# bitset MOCUS engine: basic events are interned as bit positions in an integer
+# event mask and gates as bit positions in a pending gate mask, so each partial
+# cutset row is just a pair of integers
+
+def canonical_gate_type(node_type):
+    """
+    Returns the lowercase canonical spelling of a fault tree event type such as "And", "OR" or "basic".
+
+    Voting gates are written as "Vote k" or "KofN k" (or as a tuple such as ``("Vote", 2)``) and are returned as "vote k".
+    """
+    if isinstance(node_type, (tuple, list)):
+        node_type = ' '.join(str(part) for part in node_type)
+    words = str(node_type).strip().lower().split()
+    if words and words[0] in ('vote', 'kofn'):
+        if len(words) != 2 or not words[1].isdigit():
+            raise ErrorMsg(f"Exception: Voting gates need a threshold in the form 'Vote k', not {node_type}")
+        return f'vote {int(words[1])}'
+    return ' '.join(words)
+
+
+def vote_threshold(node_type):
+    """
+    Returns the number of failed inputs k that trigger a k-out-of-n voting gate, or None for other event types.
+    """
+    gate_type = canonical_gate_type(node_type)
+    if gate_type.startswith('vote '):
+        return int(gate_type.split()[1])
+    return None
+
+
+def voting_probability(probabilities, k):
+    """
+    Returns the probability that at least k of the independent events with the given probabilities occur.
+
+    Uses the O(n k) recursion P(at least j of i+1) = P(at least j of i) + p * P(exactly j-1 of i) instead of enumerating combinations.
+    """
+    at_least = [1.0] + [0.0] * k
+    for p in probabilities:
+        for j in range(k, 0, -1):
+            at_least[j] += p * (at_least[j - 1] - at_least[j])
+    return at_least[k]
+
+
+class VotingAlternatives(object):
+    """
+    The "or" alternatives of a k-out-of-n voting gate for the bitset MOCUS engine, generated lazily as k-input combinations each time the gate is expanded rather than stored.
+    """
+
+    def __init__(self, inputs, k):
+        self.inputs = inputs
+        self.k = k
+
+    def __iter__(self):
+        for combination in itertools.combinations(self.inputs, self.k):
+            event_mask, gate_mask = 0, 0
+            for input_events, input_gates in combination:
+                event_mask |= input_events
+                gate_mask |= input_gates
+            yield event_mask, gate_mask
+
+
+def fault_tree_rows(fault_tree):
+    """
+    Normalizes fault tree rows to (name, type, probability, branches) tuples.
+
+    Accepts both the qualitative form ``(name, type, branches)`` and the quantitative form ``(name, type, probability, branches)`` used by draw_fault_tree_diagram_quantitative, where basic events may also be given as ``(name, type, probability)``. Event types are returned in canonical lowercase spelling, missing probabilities are returned as None and blank branches are dropped.
+    """
+    if isinstance(fault_tree, FaultTree):
+        return fault_tree.rows
+    rows = []
+    for event in fault_tree:
+        name, node_type = event[0], event[1]
+        probability, branches = None, []
+        if len(event) >= 4:
+            probability, branches = event[2], event[3]
+        elif len(event) == 3:
+            if isinstance(event[2], (list, tuple)):
+                branches = event[2]
+            else:
+                probability = event[2]
+        if probability == '':
+            probability = None
+        rows.append((name, canonical_gate_type(node_type), probability, [branch for branch in branches if branch != '']))
+    return rows
+
+
+class FaultTree(object):
+    """
+    A fault tree compiled once from the list of tuples format so repeated analyses skip re-parsing.
+
+    Every event gets an integer node id, with the top event as node 0. Event types are canonicalized and the children of node ``i`` are ``child_ids[child_offsets[i]:child_offsets[i + 1]]`` in compressed sparse row (CSR) form. ``order`` lists the nodes reachable from the top event in topological order with children before parents, found without recursion so deep trees work. Compiled results such as the bitset cutset tree, binary decision diagram and modules are kept in ``cache``.
+
+    A FaultTree behaves as the list of tuples it was compiled from, so it can be passed to every fault tree function in place of the list.
+    """
+
+    def __init__(self, fault_tree):
+        if isinstance(fault_tree, FaultTree):
+            fault_tree = fault_tree.fault_tree
+        self.fault_tree = list(fault_tree)
+        self.rows = fault_tree_rows(self.fault_tree)
+        self.top_name = self.rows[0][0]
+
+        self.names = []
+        self.node_ids = {}
+        self.types = []
+        self.probabilities = []
+        branch_lists = []
+        for name, node_type, probability, branches in self.rows:
+            if name in self.node_ids:
+                continue
+            self.node_ids[name] = len(self.names)
+            self.names.append(name)
+            self.types.append(node_type)
+            self.probabilities.append(probability)
+            branch_lists.append(branches)
+        for branches in list(branch_lists):
+            for branch in branches:
+                if branch not in self.node_ids:
+                    self.node_ids[branch] = len(self.names)
+                    self.names.append(branch)
+                    self.types.append('basic')
+                    self.probabilities.append(None)
+                    branch_lists.append([])
+        self.thresholds = [vote_threshold(node_type) for node_type in self.types]
+
+        self.child_offsets = [0]
+        self.child_ids = []
+        for branches in branch_lists:
+            self.child_ids.extend(self.node_ids[branch] for branch in branches)
+            self.child_offsets.append(len(self.child_ids))
+
+        self.order = []
+        state = {0: 1}  # 1 = on the stack, 2 = finished
+        stack = [(0, iter(self.children(0)))]
+        while stack:
+            node, children = stack[-1]
+            for child in children:
+                if state.get(child) == 1:
+                    raise ErrorMsg(f"Exception: The fault tree contains a cycle through gate {self.names[child]}")
+                if child not in state:
+                    state[child] = 1
+                    stack.append((child, iter(self.children(child))))
+                    break
+            else:
+                state[node] = 2
+                self.order.append(node)
+                stack.pop()
+        self.cache = {}
+
+    def children(self, node):
+        return self.child_ids[self.child_offsets[node]:self.child_offsets[node + 1]]
+
+    def is_gate(self, node):
+        return self.types[node] != 'basic'
+
+    @property
+    def gate_names(self):
+        """
+        Names of the gates reachable from the top event in topological order, children before parents.
+        """
+        return [self.names[node] for node in self.order if self.types[node] != 'basic']
+
+    @property
+    def event_names(self):
+        """
+        Names of the basic events reachable from the top event in depth-first order.
+        """
+        return [self.names[node] for node in self.order if self.types[node] == 'basic']
+
+    def __len__(self):
+        return len(self.fault_tree)
+
+    def __iter__(self):
+        return iter(self.fault_tree)
+
+    def __getitem__(self, index):
+        return self.fault_tree[index]
+
+    def __repr__(self):
+        return f'FaultTree({self.top_name!r}, {len(self.order)} nodes)'
+
+
+def as_fault_tree(fault_tree):
+    """
+    Returns a compiled FaultTree, compiling a list of tuples if needed.
+    """
+    if isinstance(fault_tree, FaultTree):
+        return fault_tree
+    return FaultTree(fault_tree)
+
+
+class NormalizedFaultTree(list):
+    """
+    A list of fault tree rows produced by normalize_fault_tree, which also records ``eliminated_nodes``, the number of rows removed, and ``duplicate_inputs``, the number of repeated gate inputs dropped.
+    """
+
+    def __init__(self, rows=(), eliminated_nodes=0, duplicate_inputs=0):
+        super().__init__(rows)
+        self.eliminated_nodes = eliminated_nodes
+        self.duplicate_inputs = duplicate_inputs
+
+
+def normalize_fault_tree(fault_tree, verbose=False):
+    """
+    Returns a smaller equivalent fault tree.
+
+    Event types are canonicalized to "and", "or" and "basic", a gate nested under a gate of the same type has its inputs pulled up into its parent, gates with a single input are replaced by that input, 1-out-of-n and n-out-of-n voting gates become "or" and "and" gates, repeated inputs of "and" and "or" gates are removed and rows unreachable from the top event are dropped. The top event keeps its name. The rows keep the qualitative or quantitative form of the input.
+
+    Parameters
+    ----------
+    fault_tree : list of tuples
+        A fault tree in the form taken by ``fault_tree_diagram`` or ``draw_fault_tree_diagram_quantitative``.
+    verbose : boolean, optional
+        Print how many nodes and duplicate inputs were eliminated.
+
+    Returns
+    -------
+    fault_tree : NormalizedFaultTree
+        The normalized rows as a list of tuples, with the ``eliminated_nodes`` and ``duplicate_inputs`` counts as attributes.
+
+    """
+    rows = fault_tree_rows(fault_tree)
+    quantitative = any(len(event) >= 4 for event in fault_tree)
+    gates = {name: (node_type, branches) for name, node_type, probability, branches in rows if node_type != 'basic'}
+    top_name = rows[0][0]
+
+    postorder = []
+    state = {}
+    stack = [(top_name, None)]
+    while stack:
+        name, children = stack[-1]
+        if children is None:
+            if name not in gates or name in state:
+                stack.pop()
+                continue
+            state[name] = 1
+            children = iter(gates[name][1])
+            stack[-1] = (name, children)
+        for child in children:
+            if state.get(child) == 1:
+                raise ErrorMsg(f"Exception: The fault tree contains a cycle through gate {child}")
+            if child in gates and child not in state:
+                stack.append((child, None))
+                break
+        else:
+            state[name] = 2
+            postorder.append(name)
+            stack.pop()
+
+    normalized = {}  # gate -> (type, branches) after normalization
+    alias = {}  # eliminated single input gate -> the event it passes through
+    duplicate_inputs = 0
+    for gate in postorder:
+        node_type, branches = gates[gate]
+        k = vote_threshold(node_type)
+        if k is not None:
+            # a voting gate counts its inputs, so repeated inputs are kept
+            branches = [alias.get(branch, branch) for branch in branches]
+            if k == 1:
+                node_type = 'or'
+            elif k == len(branches) and len(set(branches)) == len(branches):
+                node_type = 'and'
+            else:
+                normalized[gate] = (node_type, branches)
+                continue
+        inputs = []
+        seen = set()
+        for branch in branches:
+            branch = alias.get(branch, branch)
+            if branch in normalized and normalized[branch][0] == node_type and node_type in ('and', 'or'):
+                children = normalized[branch][1]
+            else:
+                children = [branch]
+            for child in children:
+                if child in seen:
+                    duplicate_inputs += 1
+                    continue
+                seen.add(child)
+                inputs.append(child)
+        if len(inputs) == 1 and node_type in ('and', 'or'):
+            if gate != top_name:
+                alias[gate] = inputs[0]
+                continue
+            if inputs[0] in normalized:
+                node_type, inputs = normalized[inputs[0]]
+        normalized[gate] = (node_type, inputs)
+
+    reachable = {top_name}
+    stack = [top_name]
+    while stack:
+        name = stack.pop()
+        for branch in normalized.get(name, (None, []))[1]:
+            if branch not in reachable:
+                reachable.add(branch)
+                stack.append(branch)
+
+    result = []
+    for name, node_type, probability, branches in rows:
+        if name not in reachable or (name in gates and name not in normalized):
+            continue
+        if name in normalized:
+            node_type, branches = normalized[name]
+            if quantitative:
+                result.append((name, node_type, '' if probability is None else probability, list(branches)))
+            else:
+                result.append((name, node_type, list(branches)))
+        elif quantitative:
+            result.append((name, node_type, probability, []))
+        else:
+            result.append((name, node_type, []))
+        reachable.discard(name)
+    eliminated_nodes = len(fault_tree) - len(result)
+    if verbose:
+        print(f"Normalization eliminated {eliminated_nodes} nodes and {duplicate_inputs} duplicate inputs")
+    return NormalizedFaultTree(result, eliminated_nodes, duplicate_inputs)
+
+
+def bits(mask):
+    """
+    Yields the positions of the set bits in an integer mask in increasing order.
+    """
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+def bit_count(mask):
+    return bin(mask).count('1')
+
+
+def intern_basic_events(rows, gates):
+    """
+    Numbers the basic events of normalized fault tree rows in order of first appearance.
+    """
+    event_ids = {}
+    for name, node_type, probability, branches in rows:
+        for event in [name] + list(branches):
+            if event not in gates and event not in event_ids:
+                event_ids[event] = len(event_ids)
+    return event_ids
+
+
+def compile_cutset_tree(fault_tree):
+    """
+    Interns a fault tree for the bitset MOCUS engine.
+
+    Basic events are numbered in order of first appearance and gates are numbered in topological order from the top event, so expanding the lowest pending gate bit always expands a gate after all of its parents. Any branch that is not itself defined as a gate is treated as a basic event.
+
+    Returns
+    -------
+    event_names : list of strings
+        Basic event names indexed by their bit position.
+    gate_names : list of strings
+        Gate names indexed by their bit position, top event first.
+    alternatives : list of lists of tuples
+        For every gate the list of ``(event mask, gate mask)`` alternatives it rewrites to. An "and" gate has a single alternative holding all of its inputs, an "or" gate has one alternative per input and a k-out-of-n voting gate has one alternative per combination of k inputs, generated lazily.
+    """
+    tree = as_fault_tree(fault_tree)
+    if 'cutset_tree' in tree.cache:
+        return tree.cache['cutset_tree']
+    rows = tree.rows
+    gates = {name: (node_type, branches) for name, node_type, probability, branches in rows if node_type != 'basic'}
+    event_ids = intern_basic_events(rows, gates)
+    gate_order = list(reversed(tree.gate_names))
+    gate_ids = {gate: index for index, gate in enumerate(gate_order)}
+
+    alternatives = []
+    for gate in gate_order:
+        node_type, branches = gates[gate]
+        inputs = []
+        for branch in branches:
+            if branch in gate_ids:
+                inputs.append((0, 1 << gate_ids[branch]))
+            else:
+                inputs.append((1 << event_ids[branch], 0))
+        k = vote_threshold(node_type)
+        if node_type == 'and':
+            event_mask, gate_mask = 0, 0
+            for input_events, input_gates in inputs:
+                event_mask |= input_events
+                gate_mask |= input_gates
+            alternatives.append([(event_mask, gate_mask)])
+        elif k is not None:
+            alternatives.append(VotingAlternatives(inputs, k))
+        else:
+            alternatives.append(inputs)
+    tree.cache['cutset_tree'] = list(event_ids), gate_order, alternatives
+    return tree.cache['cutset_tree']
+
+
+class CutsetList(list):
+    """
+    A list of minimal cutsets that also records what was dropped by truncation.
+
+    ``truncated_rows`` counts the partial cutset rows discarded during expansion and ``truncated_probability`` sums their probabilities, which bounds the probability of all the cutsets they could have produced (rare event approximation). The probability is None when rows were dropped by order alone and the basic event probabilities are not all known.
+    """
+
+    def __init__(self, cutsets=(), truncated_rows=0, truncated_probability=0.0):
+        super().__init__(cutsets)
+        self.truncated_rows = truncated_rows
+        self.truncated_probability = truncated_probability
+
+
+def basic_event_probabilities(fault_tree):
+    """
+    Returns a dictionary of basic event probabilities from a quantitative fault tree in the form taken by draw_fault_tree_diagram_quantitative.
+    """
+    return {name: probability for name, node_type, probability, branches in fault_tree_rows(fault_tree) if node_type == 'basic' and probability is not None}
+
+
+def expand_cutset_masks(alternatives, rows, max_order=None, cutoff=None, event_probabilities=None):
+    """
+    Expands the pending gates of the given starting rows from a worklist and returns the set of event masks of all (not necessarily minimal) cutsets.
+
+    Each row is an ``(event mask, gate mask)`` pair. If a maximum order or a probability cutoff is given, rows are dropped as soon as they exceed the order or their probability falls below the cutoff, since adding events can only make a row larger and less likely. Returns the cutset masks, the number of rows dropped and the summed probability of the dropped rows.
+    """
+    cutset_masks = set()
+    truncated_rows, truncated_probability = 0, 0.0
+    if max_order is None and cutoff is None:
+        worklist = list(rows)
+        while worklist:
+            event_mask, gate_mask = worklist.pop()
+            if not gate_mask:
+                cutset_masks.add(event_mask)
+                continue
+            low = gate_mask & -gate_mask
+            rest = gate_mask ^ low
+            for input_events, input_gates in alternatives[low.bit_length() - 1]:
+                worklist.append((event_mask | input_events, rest | input_gates))
+        return cutset_masks, truncated_rows, truncated_probability
+
+    if cutoff is None:
+        cutoff = 0.0
+    if event_probabilities is None:
+        truncated_probability = None
+    worklist = []
+    for event_mask, gate_mask in rows:
+        probability = 1.0
+        if event_probabilities is not None:
+            for event in bits(event_mask):
+                probability *= event_probabilities[event]
+        if (max_order is not None and bit_count(event_mask) > max_order) or probability < cutoff:
+            truncated_rows += 1
+            truncated_probability = add_truncated_probability(truncated_probability, probability)
+        else:
+            worklist.append((event_mask, gate_mask, probability))
+    while worklist:
+        event_mask, gate_mask, probability = worklist.pop()
+        if not gate_mask:
+            cutset_masks.add(event_mask)
+            continue
+        low = gate_mask & -gate_mask
+        rest = gate_mask ^ low
+        for input_events, input_gates in alternatives[low.bit_length() - 1]:
+            new_events = input_events & ~event_mask
+            new_probability = probability
+            if event_probabilities is not None:
+                for event in bits(new_events):
+                    new_probability *= event_probabilities[event]
+            new_mask = event_mask | new_events
+            if (max_order is not None and bit_count(new_mask) > max_order) or new_probability < cutoff:
+                truncated_rows += 1
+                truncated_probability = add_truncated_probability(truncated_probability, new_probability)
+                continue
+            worklist.append((new_mask, rest | input_gates, new_probability))
+    return cutset_masks, truncated_rows, truncated_probability
+
+
+def split_cutset_rows(alternatives, rows, count, max_order=None, cutoff=None, event_probabilities=None):
+    """
+    Expands rows breadth first until there are at least ``count`` of them (or none are left to expand), so the expansion can be divided between worker processes.
+
+    New rows are truncated exactly as ``expand_cutset_masks`` truncates them, so the serial and parallel expansions drop the same rows. Returns the rows, the number of rows dropped and the summed probability of the dropped rows.
+    """
+    truncated = max_order is not None or cutoff is not None
+    if cutoff is None:
+        cutoff = 0.0
+    truncated_rows = 0
+    truncated_probability = None if truncated and event_probabilities is None else 0.0
+    rows = [(event_mask, gate_mask, math.prod(event_probabilities[event] for event in bits(event_mask)) if event_probabilities is not None else 1.0)
+            for event_mask, gate_mask in rows]
+    while len(rows) < count:
+        expanded = []
+        for event_mask, gate_mask, probability in rows:
+            if not gate_mask:
+                expanded.append((event_mask, gate_mask, probability))
+                continue
+            low = gate_mask & -gate_mask
+            rest = gate_mask ^ low
+            for input_events, input_gates in alternatives[low.bit_length() - 1]:
+                new_events = input_events & ~event_mask
+                new_probability = probability
+                if event_probabilities is not None:
+                    for event in bits(new_events):
+                        new_probability *= event_probabilities[event]
+                new_mask = event_mask | new_events
+                if truncated and ((max_order is not None and bit_count(new_mask) > max_order) or new_probability < cutoff):
+                    truncated_rows += 1
+                    truncated_probability = add_truncated_probability(truncated_probability, new_probability)
+                    continue
+                expanded.append((new_mask, rest | input_gates, new_probability))
+        if expanded == rows:
+            break
+        rows = expanded
+    return [(event_mask, gate_mask) for event_mask, gate_mask, probability in rows], truncated_rows, truncated_probability
+
+
+def expand_and_minimize_cutset_masks(alternatives, rows, max_order=None, cutoff=None, event_probabilities=None):
+    """
+    Expands and locally minimizes one partition of rows. This is the unit of work sent to each worker process.
+    """
+    cutset_masks, truncated_rows, truncated_probability = expand_cutset_masks(alternatives, rows, max_order=max_order, cutoff=cutoff, event_probabilities=event_probabilities)
+    return minimize_cutset_masks(cutset_masks), truncated_rows, truncated_probability
+
+
+def parallel_cutset_masks(alternatives, rows, workers, max_order=None, cutoff=None, event_probabilities=None):
+    """
+    Partitions the starting rows by their "or" alternatives, then expands and locally minimizes each partition in a process pool. Returns the merged (not yet globally minimal) cutset masks and the summed truncation counts.
+    """
+    rows, truncated_rows, truncated_probability = split_cutset_rows(alternatives, rows, 4 * workers, max_order=max_order, cutoff=cutoff, event_probabilities=event_probabilities)
+    partitions = [rows[index::4 * workers] for index in range(min(len(rows), 4 * workers))]
+    cutset_masks = set()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(expand_and_minimize_cutset_masks, alternatives, partition, max_order, cutoff, event_probabilities) for partition in partitions]
+        for future in futures:
+            masks, rows_dropped, probability_dropped = future.result()
+            cutset_masks.update(masks)
+            truncated_rows += rows_dropped
+            truncated_probability = add_truncated_probability(truncated_probability, probability_dropped)
+    return cutset_masks, truncated_rows, truncated_probability
+
+
+def trie_contains_subset(trie, keys):
+    """
+    Returns True if the cutset trie holds a cutset whose sorted keys are a subset of the given sorted keys.
+    """
+    stack = [(trie, 0)]
+    while stack:
+        node, start = stack.pop()
+        if None in node:
+            return True
+        for position in range(start, len(keys)):
+            child = node.get(keys[position])
+            if child is not None:
+                stack.append((child, position + 1))
+    return False
+
+
+def minimize_cutset_masks(cutset_masks):
+    """
+    Removes every cutset mask that is a superset of another and returns the minimal masks sorted by order.
+
+    Candidates are checked in increasing order against a trie of the minimal cutsets accepted so far, so each candidate is only compared with the smaller cutsets that share its events. Events are keyed by increasing frequency so that rare events prune the trie search early.
+    """
+    candidates = sorted(set(cutset_masks), key=lambda mask: (bit_count(mask), mask))
+    frequency = {}
+    for mask in candidates:
+        for event in bits(mask):
+            frequency[event] = frequency.get(event, 0) + 1
+    rank = {event: position for position, event in enumerate(sorted(frequency, key=lambda event: (frequency[event], event)))}
+
+    trie = {}
+    minimal = []
+    for mask in candidates:
+        keys = sorted(rank[event] for event in bits(mask))
+        if trie_contains_subset(trie, keys):
+            continue
+        minimal.append(mask)
+        node = trie
+        for key in keys:
+            node = node.setdefault(key, {})
+        node[None] = True
+    return minimal
+
+
+def minimize_cutsets(cutsets):
+    """
+    Returns the minimal cutsets from a list of candidate cutsets.
+
+    Parameters
+    ----------
+    cutsets : list of lists
+        Candidate cutsets, each given as a list (or other iterable) of event names. Duplicate events and duplicate cutsets are allowed.
+
+    Returns
+    -------
+    cutsets : list of lists
+        The cutsets that contain no other candidate cutset, sorted by order with events in order of first appearance.
+
+    """
+    event_ids = {}
+    masks = []
+    for cutset in cutsets:
+        mask = 0
+        for event in cutset:
+            mask |= 1 << event_ids.setdefault(event, len(event_ids))
+        masks.append(mask)
+    return masks_to_cutsets(minimize_cutset_masks(masks), list(event_ids))
+
+
+def masks_to_cutsets(masks, event_names):
+    return [[event_names[event] for event in bits(mask)] for mask in masks]
+
+
+def truncation_event_probabilities(fault_tree, event_names, max_order=None, cutoff=None, probabilities=None):
+    """
+    Returns the basic event probabilities indexed by event id when the expansion is truncated, so that the probability of the dropped rows can be reported, otherwise None.
+
+    A probability cutoff needs the probabilities of all basic events. With a maximum order alone they are taken from the fault tree or ``probabilities`` when all are known, and None is returned otherwise.
+    """
+    if max_order is None and cutoff is None:
+        return None
+    if probabilities is None:
+        probabilities = basic_event_probabilities(fault_tree)
+    missing = [event for event in event_names if not isinstance(probabilities.get(event), numbers.Real)]
+    if missing:
+        if cutoff is None:
+            return None
+        raise ErrorMsg(f"Exception: A probability cutoff needs probabilities for all basic events, missing {missing}")
+    return [probabilities[event] for event in event_names]
+
+
+def add_truncated_probability(total, probability):
+    """
+    Returns the sum of two truncated probability masses, or None if either is unknown.
+    """
+    if total is None or probability is None:
+        return None
+    return total + probability
+
+
+# out-of-core expansion: partial rows beyond the memory budget are spilled to
+# fixed-width binary records on local disk and cutsets are written out as sorted
+# runs that are merged and minimized at the end
+
+def estimated_row_bytes(event_count, gate_count):
+    """
+    Returns the approximate memory in bytes held by one partial cutset row of a tree with the given numbers of basic events and gates.
+    """
+    return sys.getsizeof((0, 0, 0.0)) + sys.getsizeof(1 << event_count) + sys.getsizeof(1 << gate_count) + sys.getsizeof(0.0) + 8
+
+
+def write_mask_records(file, records, event_bytes, gate_bytes=0):
+    """
+    Writes ``(event mask, gate mask, probability)`` rows, or bare event masks when ``gate_bytes`` is 0, as fixed-width little-endian records.
+    """
+    if gate_bytes:
+        file.write(b''.join(event_mask.to_bytes(event_bytes, 'little') + gate_mask.to_bytes(gate_bytes, 'little') + struct.pack('<d', probability)
+                            for event_mask, gate_mask, probability in records))
+    else:
+        file.write(b''.join(event_mask.to_bytes(event_bytes, 'little') for event_mask in records))
+
+
+def read_mask_records(path, event_bytes, gate_bytes=0, chunk_records=65536):
+    """
+    Yields the records written by write_mask_records from a file, reading it in chunks.
+    """
+    record_bytes = event_bytes + (gate_bytes + 8 if gate_bytes else 0)
+    with open(path, 'rb') as file:
+        while True:
+            chunk = file.read(record_bytes * chunk_records)
+            if not chunk:
+                return
+            for start in range(0, len(chunk), record_bytes):
+                event_mask = int.from_bytes(chunk[start:start + event_bytes], 'little')
+                if not gate_bytes:
+                    yield event_mask
+                    continue
+                gate_start = start + event_bytes
+                gate_mask = int.from_bytes(chunk[gate_start:gate_start + gate_bytes], 'little')
+                yield event_mask, gate_mask, struct.unpack_from('<d', chunk, gate_start + gate_bytes)[0]
+
+
+def expand_cutset_masks_on_disk(alternatives, rows, event_count, gate_count, memory_limit, max_order=None, cutoff=None, event_probabilities=None, directory=None):
+    """
+    Expands and minimizes cutset rows like expand_cutset_masks followed by minimize_cutset_masks, but holds no more than about ``memory_limit`` bytes of rows in memory.
+
+    When the worklist outgrows half the budget its oldest rows are spilled to a binary file, and the files are read back once the worklist runs dry. Finished cutsets are minimized and written to disk as runs sorted by order whenever they outgrow the other half, and the runs are combined by a streaming merge that keeps each candidate only if no smaller cutset already accepted is a subset of it. Returns the minimal masks sorted by order, the number of rows dropped and their summed probability.
+    """
+    event_bytes = max(1, (event_count + 7) // 8)
+    gate_bytes = max(1, (gate_count + 7) // 8)
+    budget = max(16, memory_limit // estimated_row_bytes(event_count, gate_count)) // 2
+    if cutoff is None:
+        cutoff = 0.0
+    truncated_rows = 0
+    truncated_probability = None if event_probabilities is None and max_order is not None else 0.0
+    with tempfile.TemporaryDirectory(prefix='pyml-cutsets-', dir=directory) as spill_directory:
+        row_files = []
+        run_files = []
+        spilled = itertools.count()
+
+        def spill(prefix, records, gate_bytes):
+            path = os.path.join(spill_directory, f"{prefix}{next(spilled)}.bin")
+            with open(path, 'wb') as file:
+                write_mask_records(file, records, event_bytes, gate_bytes)
+            return path
+
+        worklist = []
+        for event_mask, gate_mask in rows:
+            probability = 1.0
+            if event_probabilities is not None:
+                for event in bits(event_mask):
+                    probability *= event_probabilities[event]
+            worklist.append((event_mask, gate_mask, probability))
+        cutset_masks = set()
+        while worklist or row_files:
+            if not worklist:
+                path = row_files.pop()
+                worklist = list(read_mask_records(path, event_bytes, gate_bytes))
+                os.remove(path)
+            event_mask, gate_mask, probability = worklist.pop()
+            if (max_order is not None and bit_count(event_mask) > max_order) or probability < cutoff:
+                truncated_rows += 1
+                truncated_probability = add_truncated_probability(truncated_probability, probability)
+                continue
+            if not gate_mask:
+                cutset_masks.add(event_mask)
+                if len(cutset_masks) > budget:
+                    run_files.append(spill('run', minimize_cutset_masks(cutset_masks), 0))
+                    cutset_masks = set()
+                continue
+            low = gate_mask & -gate_mask
+            rest = gate_mask ^ low
+            for input_events, input_gates in alternatives[low.bit_length() - 1]:
+                new_events = input_events & ~event_mask
+                new_probability = probability
+                if event_probabilities is not None:
+                    for event in bits(new_events):
+                        new_probability *= event_probabilities[event]
+                worklist.append((event_mask | new_events, rest | input_gates, new_probability))
+            if len(worklist) > budget:
+                half = len(worklist) // 2
+                row_files.append(spill('rows', worklist[:half], gate_bytes))
+                del worklist[:half]
+
+        if not run_files:
+            return minimize_cutset_masks(cutset_masks), truncated_rows, truncated_probability
+        runs = [read_mask_records(path, event_bytes) for path in run_files]
+        runs.append(iter(minimize_cutset_masks(cutset_masks)))
+        trie = {}
+        minimal = []
+        previous = None
+        for mask in heapq.merge(*runs, key=lambda mask: (bit_count(mask), mask)):
+            if mask == previous:
+                continue
+            previous = mask
+            keys = list(bits(mask))
+            if trie_contains_subset(trie, keys):
+                continue
+            minimal.append(mask)
+            node = trie
+            for key in keys:
+                node = node.setdefault(key, {})
+            node[None] = True
+        return minimal, truncated_rows, truncated_probability
+
+
+def mocus_bitset(fault_tree, max_order=None, cutoff=None, probabilities=None, workers=None, memory_limit=None):
+    """
+    Returns the minimal cutsets of a fault tree using the bitset MOCUS engine.
+
+    Takes the same fault tree list as mocus and returns the same minimal cutsets as a list of event lists sorted by order, but holds every partial cutset as a pair of integer masks and expands gates from a worklist rather than rescanning and rebuilding the whole path list. See mocus for the truncation, ``workers`` and ``memory_limit`` parameters.
+    """
+    event_names, gate_names, alternatives = compile_cutset_tree(fault_tree)
+    event_probabilities = truncation_event_probabilities(fault_tree, event_names, max_order, cutoff, probabilities)
+    if not gate_names:
+        return CutsetList([[event_names[0]]])
+    if memory_limit is not None:
+        if workers is not None and workers > 1:
+            raise ErrorMsg("Exception: memory_limit cannot be combined with workers")
+        minimal, truncated_rows, truncated_probability = expand_cutset_masks_on_disk(alternatives, [(0, 1)], len(event_names), len(gate_names), memory_limit, max_order=max_order, cutoff=cutoff, event_probabilities=event_probabilities)
+        return CutsetList(masks_to_cutsets(minimal, event_names), truncated_rows, truncated_probability)
+    if workers is not None and workers > 1:
+        cutset_masks, truncated_rows, truncated_probability = parallel_cutset_masks(alternatives, [(0, 1)], workers, max_order=max_order, cutoff=cutoff, event_probabilities=event_probabilities)
+    else:
+        cutset_masks, truncated_rows, truncated_probability = expand_cutset_masks(alternatives, [(0, 1)], max_order=max_order, cutoff=cutoff, event_probabilities=event_probabilities)
+    return CutsetList(masks_to_cutsets(minimize_cutset_masks(cutset_masks), event_names), truncated_rows, truncated_probability)
+
+
+class BDD(object):
+    """
+    A shared, hash-consed binary decision diagram compiled from a fault tree.
+
+    Nodes are integer ids into the ``var``, ``low`` and ``high`` lists, with 0 and 1 as the terminal nodes, and a unique table guarantees that every distinct (variable, low, high) triple exists only once. Gate results are combined with a computed-table cache, so shared events and repeated gates are only compiled once. Variables are ordered by a depth-first traversal from the top event.
+
+    The same node store holds the zero-suppressed decision diagram (ZBDD) of the minimal cutsets, where a node stands for the family of event sets ``{x + s : s in high} + low``.
+    """
+
+    def __init__(self, fault_tree):
+        tree = as_fault_tree(fault_tree)
+        self.gates = {name: (node_type, branches) for name, node_type, probability, branches in tree.rows if node_type != 'basic'}
+        self.probabilities = basic_event_probabilities(tree)
+        self.top_name = tree.top_name
+        self.variables = tree.event_names
+        self.var_index = {event: var for var, event in enumerate(self.variables)}
+        order = tree.gate_names
+
+        terminal_var = len(self.variables)
+        self.var = [terminal_var, terminal_var]
+        self.low = [0, 1]
+        self.high = [0, 1]
+        self.unique = {}
+        self.computed = {}
+        self.minsol_cache = {}
+        self.without_cache = {}
+        self._minimal_cutsets_root = None
+        self.lock = threading.Lock()  # building the ZBDD adds nodes to the shared store
+
+        self.gate_nodes = {}
+        for gate in order:
+            node_type, branches = self.gates[gate]
+            k = vote_threshold(node_type)
+            if k is not None:
+                # at_least[j] is the node for "at least j of the inputs so far", built in O(n k) operations
+                at_least = [1] + [0] * k
+                for branch in branches:
+                    node = self.node_of(branch)
+                    for j in range(k, 0, -1):
+                        at_least[j] = self.apply('or', at_least[j], self.apply('and', at_least[j - 1], node))
+                self.gate_nodes[gate] = at_least[k]
+                continue
+            operation = 'and' if node_type == 'and' else 'or'
+            result = 1 if operation == 'and' else 0
+            for branch in branches:
+                result = self.apply(operation, result, self.node_of(branch))
+            self.gate_nodes[gate] = result
+        self.root = self.node_of(self.top_name)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['lock']  # locks cannot be sent to worker processes
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.lock = threading.Lock()
+
+    def node_of(self, name):
+        if name in self.gate_nodes:
+            return self.gate_nodes[name]
+        return self.mk(self.var_index[name], 0, 1)
+
+    def mk(self, var, low, high):
+        """
+        Returns the unique BDD node for a variable and its low (false) and high (true) children.
+        """
+        if low == high:
+            return low
+        return self.unique_node(var, low, high)
+
+    def zmk(self, var, low, high):
+        """
+        Returns the unique ZBDD node for a variable, applying the zero-suppression rule.
+        """
+        if high == 0:
+            return low
+        return self.unique_node(var, low, high)
+
+    def unique_node(self, var, low, high):
+        key = (var, low, high)
+        node = self.unique.get(key)
+        if node is None:
+            node = len(self.var)
+            self.var.append(var)
+            self.low.append(low)
+            self.high.append(high)
+            self.unique[key] = node
+        return node
+
+    def applied(self, operation, f, g):
+        """
+        Returns the BDD node for ``f and g`` or ``f or g`` if it is a terminal case or already computed, or None.
+        """
+        if operation == 'and':
+            if f == 0 or g == 0:
+                return 0
+            if f == 1 or f == g:
+                return g
+            if g == 1:
+                return f
+        else:
+            if f == 1 or g == 1:
+                return 1
+            if f == 0 or f == g:
+                return g
+            if g == 0:
+                return f
+        return self.computed.get((operation, min(f, g), max(f, g)))
+
+    def apply(self, operation, f, g):
+        """
+        Returns the BDD node for ``f and g`` or ``f or g``.
+
+        The recursion over the cofactors runs on an explicit stack, so deep diagrams need no change to the interpreter recursion limit. Each pair is expanded into its two cofactor pairs, which are pushed above the step that combines their results.
+        """
+        stack = [(f, g)]
+        while stack:
+            item = stack.pop()
+            if len(item) == 2:
+                f, g = item
+                if self.applied(operation, f, g) is not None:
+                    continue
+                var = min(self.var[f], self.var[g])
+                f0, f1 = (self.low[f], self.high[f]) if self.var[f] == var else (f, f)
+                g0, g1 = (self.low[g], self.high[g]) if self.var[g] == var else (g, g)
+                stack.append((f, g, var, f0, g0, f1, g1))
+                stack.append((f0, g0))
+                stack.append((f1, g1))
+            else:
+                f, g, var, f0, g0, f1, g1 = item
+                self.computed[(operation, min(f, g), max(f, g))] = self.mk(var, self.applied(operation, f0, g0), self.applied(operation, f1, g1))
+        return self.applied(operation, f, g)
+
+    def reachable(self, *roots):
+        """
+        Returns the nodes reachable from the roots in increasing id order, which puts children before parents.
+        """
+        seen = set(roots)
+        stack = list(roots)
+        while stack:
+            node = stack.pop()
+            if node > 1:
+                for child in (self.low[node], self.high[node]):
+                    if child not in seen:
+                        seen.add(child)
+                        stack.append(child)
+        return sorted(seen)
+
+    def node_probabilities(self, probabilities=None, roots=None):
+        """
+        Returns a dictionary of the exact probabilities of the nodes reachable from the roots (the top event by default), computed children first by Shannon decomposition.
+
+        Probabilities default to the basic event probabilities of a quantitative fault tree and may be overridden by a dictionary of basic event names.
+        """
+        merged = dict(self.probabilities)
+        if probabilities is not None:
+            merged.update(probabilities)
+        missing = [event for event in self.variables if event not in merged]
+        if missing:
+            raise ErrorMsg(f"Exception: Missing probabilities for basic events {missing}")
+        event_probabilities = [merged[event] for event in self.variables]
+        if roots is None:
+            roots = [self.root]
+        node_probabilities = {0: 0.0, 1: 1.0}
+        for n in self.reachable(*roots):
+            if n > 1:
+                p = event_probabilities[self.var[n]]
+                node_probabilities[n] = p * node_probabilities[self.high[n]] + (1 - p) * node_probabilities[self.low[n]]
+        return node_probabilities
+
+    def probability(self, probabilities=None, node=None):
+        """
+        Returns the exact probability of the top event (or of another BDD node), with no rare event approximation.
+        """
+        if node is None:
+            node = self.root
+        return self.node_probabilities(probabilities, [node])[node]
+
+    def probability_samples(self, event_probabilities, node=None):
+        """
+        Returns the exact probability of the top event (or of another BDD node) for many samples at once.
+
+        ``event_probabilities`` is an array with one row of sample probabilities per variable, in the order of ``variables``, and the Shannon decomposition is evaluated as one vectorized operation per node.
+        """
+        if node is None:
+            node = self.root
+        node_probabilities = {0: np.zeros(event_probabilities.shape[1:]), 1: np.ones(event_probabilities.shape[1:])}
+        for n in self.reachable(node):
+            if n > 1:
+                p = event_probabilities[self.var[n]]
+                node_probabilities[n] = node_probabilities[self.low[n]] + p * (node_probabilities[self.high[n]] - node_probabilities[self.low[n]])
+        return node_probabilities[node]
+
+    def birnbaum_importances(self, probabilities=None):
+        """
+        Returns the top event probability and the Birnbaum importance (the derivative of the top event probability) of every variable in one pass over the diagram.
+
+        Node probabilities are computed bottom-up and the probability of reaching each node from the root top-down, then every node adds its reach probability times ``P(high) - P(low)`` to the importance of its variable.
+        """
+        node_probabilities = self.node_probabilities(probabilities)
+        merged = dict(self.probabilities)
+        if probabilities is not None:
+            merged.update(probabilities)
+        nodes = self.reachable(self.root)
+        reach = dict.fromkeys(nodes, 0.0)
+        reach[self.root] = 1.0
+        importances = [0.0] * len(self.variables)
+        for n in reversed(nodes):
+            if n > 1:
+                p = merged[self.variables[self.var[n]]]
+                reach[self.high[n]] += reach[n] * p
+                reach[self.low[n]] += reach[n] * (1 - p)
+                importances[self.var[n]] += reach[n] * (node_probabilities[self.high[n]] - node_probabilities[self.low[n]])
+        return node_probabilities[self.root], importances
+
+    def gate_probabilities(self, probabilities=None):
+        """
+        Returns a dictionary of the exact probability of every gate in one pass over the diagram.
+        """
+        node_probabilities = self.node_probabilities(probabilities, list(self.gate_nodes.values()))
+        return {gate: node_probabilities[node] for gate, node in self.gate_nodes.items()}
+
+    def minsol(self, f):
+        """
+        Returns the ZBDD of the minimal solutions of a monotone BDD node (Rauzy's algorithm).
+
+        Each node is expanded into its children on an explicit stack, above the step that combines their minimal solutions.
+        """
+        stack = [(f, False)]
+        while stack:
+            f, combine = stack.pop()
+            if f <= 1:
+                continue
+            if combine:
+                low = self.minsol_cache.get(self.low[f], self.low[f])
+                high = self.without(self.minsol_cache.get(self.high[f], self.high[f]), low)
+                self.minsol_cache[f] = self.zmk(self.var[f], low, high)
+            elif f not in self.minsol_cache:
+                stack.append((f, True))
+                stack.append((self.low[f], False))
+                stack.append((self.high[f], False))
+        return self.minsol_cache.get(f, f) if f > 1 else f
+
+    def contains_empty_set(self, p):
+        while p > 1:
+            p = self.low[p]
+        return p == 1
+
+    def subtracted(self, p, q):
+        """
+        Returns the ZBDD of the sets in family ``p`` that contain no set of family ``q`` if it is a terminal case or already computed, or None.
+        """
+        if p == 0 or p == q:
+            return 0
+        if q == 0:
+            return p
+        if q == 1:
+            return 0
+        if p == 1:
+            return 0 if self.contains_empty_set(q) else 1
+        return self.without_cache.get((p, q))
+
+    def without(self, p, q):
+        """
+        Returns the ZBDD of the sets in family ``p`` that contain no set of family ``q``.
+
+        The recursion runs on an explicit stack. Each pair is expanded into the pairs it depends on, which are pushed above the step that combines their results; when both variables match, the pair ``(high p without low q, high q)`` can only be pushed once its first member is known.
+        """
+        result = (p, q)
+        stack = [(p, q, 'expand')]
+        while stack:
+            p, q, step = stack.pop()
+            if step == 'expand':
+                if self.subtracted(p, q) is not None:
+                    continue
+                p_var, q_var = self.var[p], self.var[q]
+                if p_var < q_var:
+                    stack += [(p, q, 'split'), (self.low[p], q, 'expand'), (self.high[p], q, 'expand')]
+                elif p_var > q_var:
+                    stack += [(p, q, 'skip'), (p, self.low[q], 'expand')]
+                else:
+                    stack += [(p, q, 'inner'), (self.low[p], self.low[q], 'expand'), (self.high[p], self.low[q], 'expand')]
+            elif step == 'split':
+                self.without_cache[(p, q)] = self.zmk(self.var[p], self.subtracted(self.low[p], q), self.subtracted(self.high[p], q))
+            elif step == 'skip':
+                self.without_cache[(p, q)] = self.subtracted(p, self.low[q])
+            elif step == 'inner':
+                stack += [(p, q, 'match'), (self.subtracted(self.high[p], self.low[q]), self.high[q], 'expand')]
+            else:
+                high = self.subtracted(self.subtracted(self.high[p], self.low[q]), self.high[q])
+                self.without_cache[(p, q)] = self.zmk(self.var[p], self.subtracted(self.low[p], self.low[q]), high)
+        return self.subtracted(*result)
+
+    def minimal_cutsets_zbdd(self):
+        with self.lock:
+            if self._minimal_cutsets_root is None:
+                self._minimal_cutsets_root = self.minsol(self.root)
+        return self._minimal_cutsets_root
+
+    def minimal_cutsets(self):
+        """
+        Returns the minimal cutsets as a list of event lists sorted by order, read from the ZBDD of minimal solutions.
+        """
+        cutsets = []
+        stack = [(self.minimal_cutsets_zbdd(), ())]
+        while stack:
+            node, events = stack.pop()
+            if node == 1:
+                cutsets.append([self.variables[var] for var in events])
+            elif node > 1:
+                stack.append((self.low[node], events))
+                stack.append((self.high[node], events + (self.var[node],)))
+        cutsets.sort(key=len)
+        return cutsets
+
+
+def top_event_probability(fault_tree, probabilities=None):
+    """
+    Returns the exact top event probability of a quantitative fault tree.
+
+    Parameters
+    ----------
+    fault_tree : list of tuples
+        A fault tree in the quantitative form taken by ``draw_fault_tree_diagram_quantitative``.
+    probabilities : dictionary, optional
+        Basic event probabilities keyed by event name that override those in the fault tree.
+
+    Returns
+    -------
+    probability : float
+        The top event probability computed on a binary decision diagram, which is exact for shared events and does not use the rare event approximation for "or" gates.
+
+    """
+    return fault_tree_bdd(fault_tree).probability(probabilities)
+
+
+def fault_tree_bdd(fault_tree):
+    """
+    Returns the binary decision diagram of a fault tree, reusing the one cached on a compiled FaultTree.
+    """
+    if not isinstance(fault_tree, FaultTree):
+        return BDD(fault_tree)
+    if 'bdd' not in fault_tree.cache:
+        fault_tree.cache['bdd'] = BDD(fault_tree)
+    return fault_tree.cache['bdd']
+
+
+def iter_cutsets(fault_tree, max_order=None, cutoff=None, probabilities=None):
+    """
+    Yields the minimal cutsets of a fault tree one at a time in increasing order.
+
+    Partial cutset rows are kept in buckets by their current number of events, which can only grow, and the buckets are expanded from the smallest up. Once a bucket is exhausted every cutset of that order is known to be minimal and is yielded, and any later row that already contains a yielded cutset is dropped. Callers can stream cutsets to disk or stop early without the full list ever being held in memory.
+
+    Parameters
+    ----------
+    fault_tree : list of tuples
+        A fault tree in the form taken by ``fault_tree_cutsets``.
+    max_order : int, optional
+        Stop after the cutsets of this order.
+    cutoff : float, optional
+        Drop cutsets less probable than this, as in ``mocus``.
+    probabilities : dictionary, optional
+        Basic event probabilities keyed by event name for the cutoff.
+
+    Yields
+    ------
+    cutset : list of strings
+        The events of the next minimal cutset, in the same order as returned by ``mocus``.
+
+    """
+    event_names, gate_names, alternatives = compile_cutset_tree(fault_tree)
+    if not gate_names:
+        yield [event_names[0]]
+        return
+    event_probabilities = truncation_event_probabilities(fault_tree, event_names, cutoff=cutoff, probabilities=probabilities)
+    if cutoff is None:
+        cutoff = 0.0
+
+    buckets = {0: [(0, 1, 1.0)]}
+    trie = {}
+    while buckets:
+        order = min(buckets)
+        if max_order is not None and order > max_order:
+            break
+        worklist = buckets.pop(order)
+        found = set()
+        while worklist:
+            event_mask, gate_mask, probability = worklist.pop()
+            if trie and trie_contains_subset(trie, list(bits(event_mask))):
+                continue
+            if not gate_mask:
+                found.add(event_mask)
+                continue
+            low = gate_mask & -gate_mask
+            rest = gate_mask ^ low
+            for input_events, input_gates in alternatives[low.bit_length() - 1]:
+                new_events = input_events & ~event_mask
+                new_probability = probability
+                if event_probabilities is not None:
+                    for event in bits(new_events):
+                        new_probability *= event_probabilities[event]
+                if new_probability < cutoff:
+                    continue
+                new_order = order + bit_count(new_events)
+                row = (event_mask | new_events, rest | input_gates, new_probability)
+                if new_order == order:
+                    worklist.append(row)
+                elif max_order is None or new_order <= max_order:
+                    buckets.setdefault(new_order, []).append(row)
+        for mask in sorted(found):
+            node = trie
+            for event in bits(mask):
+                node = node.setdefault(event, {})
+            node[None] = True
+            yield [event_names[event] for event in bits(mask)]
+
+
+def find_modules(fault_tree):
+    """
+    Returns the gates that head independent modules, bottom-up with the top event last.
+
+    A module is a gate whose descendants are reached from nowhere else in the tree. Modules are found in linear time with the Dutuit-Rauzy algorithm: one depth-first traversal records the first visit, finish and last visit dates of every node, and a gate is a module if all of its descendants were first visited after it and last visited before it was finished.
+    """
+    rows = fault_tree_rows(fault_tree)
+    gates = {name: branches for name, node_type, probability, branches in rows if node_type != 'basic'}
+    top_name = rows[0][0]
+    if top_name not in gates:
+        return []
+
+    first, finish, last = {}, {}, {}
+    postorder = []
+    date = 0
+    stack = [(top_name, None)]
+    while stack:
+        name, children = stack[-1]
+        if children is None:
+            date += 1
+            if name in first:
+                last[name] = date
+                stack.pop()
+                continue
+            first[name] = finish[name] = last[name] = date
+            if name not in gates:
+                stack.pop()
+                continue
+            children = iter(gates[name])
+            stack[-1] = (name, children)
+        for child in children:
+            stack.append((child, None))
+            break
+        else:
+            date += 1
+            finish[name] = last[name] = date
+            postorder.append(name)
+            stack.pop()
+
+    earliest, latest = {}, {}
+    for gate in postorder:
+        earliest[gate] = min(min(first[child], earliest.get(child, first[child])) for child in gates[gate]) if gates[gate] else finish[gate]
+        latest[gate] = max(max(last[child], latest.get(child, last[child])) for child in gates[gate]) if gates[gate] else first[gate]
+    return [gate for gate in postorder if earliest[gate] > first[gate] and latest[gate] < finish[gate]]
+
+
+def modularize_fault_tree(fault_tree):
+    """
+    Splits a fault tree into its independent modules.
+
+    Returns a list of ``(module name, fault tree)`` pairs, bottom-up with the top event last. In each module's fault tree the module gate is the first row and every nested module is replaced by a basic pseudo-event with the nested module's name, so each module can be solved on its own and expanded at the end.
+    """
+    if isinstance(fault_tree, FaultTree) and 'modules' in fault_tree.cache:
+        return fault_tree.cache['modules']
+    rows = fault_tree_rows(fault_tree)
+    by_name = {row[0]: row for row in rows}
+    modules = find_modules(fault_tree)
+    module_set = set(modules)
+    modular = []
+    for module in modules:
+        module_rows = []
+        seen = {module}
+        stack = [module]
+        while stack:
+            name = stack.pop()
+            row = by_name.get(name)
+            if name != module and (name in module_set or row is None or row[1] == 'basic'):
+                module_rows.append(row if row is not None and name not in module_set else (name, 'basic', None, []))
+                continue
+            module_rows.append(row)
+            for branch in row[3]:
+                if branch not in seen:
+                    seen.add(branch)
+                    stack.append(branch)
+        modular.append((module, module_rows))
+    if isinstance(fault_tree, FaultTree):
+        fault_tree.cache['modules'] = modular
+    return modular
+
+
+def mocus_modular(fault_tree, max_order=None, cutoff=None, probabilities=None, workers=None, cache=None, memory_limit=None):
+    """
+    Returns the minimal cutsets of a fault tree by solving each independent module separately and substituting the module cutsets for their pseudo-events at the end.
+
+    Because modules share no events, the substituted cutsets are already minimal. With a cutoff each pseudo-event takes the probability of its most likely cutset, so partial rows are never dropped too early.
+
+    With a CutsetCache the expanded cutsets of every module are stored under the canonical hash of its sub-tree, so a module that repeats within or across fault trees is solved only once.
+    """
+    rows = fault_tree_rows(fault_tree)
+    gates = {name for name, node_type, probability, branches in rows if node_type != 'basic'}
+    if (max_order is not None or cutoff is not None) and probabilities is None:
+        probabilities = basic_event_probabilities(fault_tree)
+        events = {branch for name, node_type, probability, branches in rows for branch in branches if branch not in gates}
+        if cutoff is None and not all(isinstance(probabilities.get(event), numbers.Real) for event in events):
+            probabilities = None  # truncated by order alone, without a probability mass
+    if cache is not None and gates:
+        hashes = subtree_hashes(fault_tree, probabilities if max_order is not None or cutoff is not None else None)
+        settings = (max_order, cutoff)
+        top_key = cache.key(hashes[rows[0][0]], *settings)
+        cached = cache.get(top_key)
+        if cached is not None:
+            results, truncated_rows, truncated_probability = cached
+            return CutsetList(sort_cutsets([events for events, probability in results], rows), truncated_rows, truncated_probability)
+    modular = modularize_fault_tree(fault_tree)
+    if not modular:
+        return mocus_bitset(fault_tree, max_order=max_order, cutoff=cutoff, probabilities=probabilities, workers=workers, memory_limit=memory_limit)
+    probabilities = dict(probabilities) if probabilities is not None else None
+    if cutoff is None:
+        cutoff = 0.0
+
+    expanded = {}  # module name -> list of (events, probability)
+    truncation = {}  # module name -> (rows, probability) truncated within the module and its nested modules
+    for module, module_rows in modular:
+        nested = [row[0] for row in module_rows[1:] if row[0] in expanded]
+        if cache is not None:
+            key = cache.key(hashes[module], *settings)
+            cached = cache.get(key) if key != top_key else None  # the top was looked up already
+            if cached is not None:
+                expanded[module], truncated_rows, truncated_probability = cached
+                truncation[module] = (truncated_rows, truncated_probability)
+                if probabilities is not None:
+                    probabilities[module] = max([probability for events, probability in expanded[module]], default=0.0)
+                continue
+        cutsets = mocus_bitset(module_rows, max_order=max_order, cutoff=cutoff or None, probabilities=probabilities, workers=workers, memory_limit=memory_limit)
+        truncated_rows = cutsets.truncated_rows + sum(truncation[name][0] for name in nested)
+        truncated_probability = cutsets.truncated_probability
+        for name in nested:
+            truncated_probability = add_truncated_probability(truncated_probability, truncation[name][1])
+        results = []
+        for cutset in cutsets:
+            partial = [([], 1.0)]
+            for event in cutset:
+                options = expanded[event] if event in expanded else [([event], probabilities[event] if probabilities is not None else 1.0)]
+                combined = []
+                for events, probability in partial:
+                    for option_events, option_probability in options:
+                        new_probability = probability * option_probability
+                        if (max_order is not None and len(events) + len(option_events) > max_order) or new_probability < cutoff:
+                            truncated_rows += 1
+                            truncated_probability = add_truncated_probability(truncated_probability, new_probability if probabilities is not None else None)
+                            continue
+                        combined.append((events + option_events, new_probability))
+                partial = combined
+            results.extend(partial)
+        expanded[module] = results
+        truncation[module] = (truncated_rows, truncated_probability)
+        if probabilities is not None:
+            probabilities[module] = max([probability for events, probability in results], default=0.0)
+        if cache is not None:
+            cache.put(key, (results, truncated_rows, truncated_probability))
+    top = modular[-1][0]
+    return CutsetList(sort_cutsets([events for events, probability in expanded[top]], rows), *truncation[top])
+
+
+def sort_cutsets(cutsets, fault_tree):
+    """
+    Returns cutsets given as lists of basic event names in the order mocus uses for the fault tree: by number of events, then by the first appearance of the events in the tree rows.
+    """
+    rows = fault_tree_rows(fault_tree)
+    gates = {name for name, node_type, probability, branches in rows if node_type != 'basic'}
+    event_ids = intern_basic_events(rows, gates)
+    masks = []
+    for events in cutsets:
+        mask = 0
+        for event in events:
+            mask |= 1 << event_ids[event]
+        masks.append(mask)
+    masks.sort(key=lambda mask: (bit_count(mask), mask))
+    return masks_to_cutsets(masks, list(event_ids))
+
+
+def modular_gate_probabilities(fault_tree, probabilities=None):
+    """
+    Returns the exact probability of every gate of a quantitative fault tree, computed module by module on separate binary decision diagrams with each nested module's probability used for its pseudo-event.
+    """
+    merged = basic_event_probabilities(fault_tree)
+    if probabilities is not None:
+        merged.update(probabilities)
+    gate_probabilities = {}
+    for module, module_rows in modularize_fault_tree(fault_tree):
+        gate_probabilities.update(BDD(module_rows).gate_probabilities(merged))
+        merged[module] = gate_probabilities[module]
+    return gate_probabilities
+
+
+def scenario_matrix(tree, probabilities, events=None):
+    """
+    Returns a (number of nodes x number of scenarios) array with the basic event probabilities of every scenario filled in the rows of the basic event nodes of a compiled FaultTree.
+
+    ``probabilities`` is an (n_scenarios x n_basic_events) array whose columns follow ``events`` (the tree's ``event_names`` by default), a single vector for one scenario, or a pandas DataFrame with a column per basic event. Basic events without a column keep the probability given in the fault tree.
+    """
+    if isinstance(probabilities, pd.DataFrame):
+        events = list(probabilities.columns)
+        probabilities = probabilities.to_numpy(dtype=float)
+    probabilities = np.atleast_2d(np.asarray(probabilities, dtype=float))
+    if events is None:
+        events = tree.event_names
+    if probabilities.shape[1] != len(events):
+        raise ErrorMsg(f"Exception: Expected {len(events)} basic event columns, got {probabilities.shape[1]}")
+    values = np.full((len(tree.names), probabilities.shape[0]), np.nan)
+    for node, (node_type, probability) in enumerate(zip(tree.types, tree.probabilities)):
+        if node_type == 'basic' and probability is not None:
+            values[node] = probability
+    for column, event in enumerate(events):
+        values[tree.node_ids[event]] = probabilities[:, column]
+    missing = [tree.names[node] for node in tree.order if tree.types[node] == 'basic' and np.isnan(values[node]).any()]
+    if missing:
+        raise ErrorMsg(f"Exception: Missing probabilities for basic events {missing}")
+    return values
+
+
+def evaluate_gates(tree, values, rare_event=False):
+    """
+    Fills the gate rows of a (number of nodes x number of scenarios) array in topological order, each gate as one vectorized operation over its stacked input rows.
+    """
+    for node in tree.order:
+        if tree.types[node] == 'basic':
+            continue
+        inputs = values[tree.children(node)]
+        k = tree.thresholds[node]
+        if tree.types[node] == 'and':
+            values[node] = inputs.prod(axis=0)
+        elif k is not None:
+            at_least = np.zeros((k + 1,) + inputs.shape[1:])
+            at_least[0] = 1.0
+            for p in inputs:
+                at_least[1:] += p * (at_least[:-1] - at_least[1:])
+            values[node] = at_least[k]
+        elif rare_event:
+            values[node] = inputs.sum(axis=0)
+        else:
+            values[node] = 1.0 - (1.0 - inputs).prod(axis=0)
+    return values
+
+
+def fault_tree_probabilities(fault_tree, probabilities, events=None, rare_event=False):
+    """
+    Returns the probability of every gate of a fault tree for many sets of basic event probabilities at once, without drawing a diagram.
+
+    Parameters
+    ----------
+    fault_tree : list of tuples or FaultTree
+        A fault tree in the form taken by ``fault_tree_diagram`` or ``draw_fault_tree_diagram_quantitative``.
+    probabilities : array
+        An (n_scenarios x n_basic_events) NumPy array of basic event probabilities with one row per scenario, or a pandas DataFrame with a column per basic event. Basic events without a column keep the probability given in the fault tree.
+    events : list of strings, optional
+        The basic event name of each column. Defaults to ``FaultTree(fault_tree).event_names``, the basic events in depth-first order from the top event.
+    rare_event : boolean, optional
+        Add the probabilities of "or" gate inputs (the rare event approximation used by ``draw_fault_tree_diagram_quantitative``) instead of combining their complements, ``1 - (1 - p1)(1 - p2)...``.
+
+    Returns
+    -------
+    probabilities : dictionary
+        An array of n_scenarios probabilities for every gate keyed by gate name. Gates are evaluated as if their inputs were independent, so use ``top_event_probability`` for exact results on trees with shared events.
+
+    """
+    tree = as_fault_tree(fault_tree)
+    values = evaluate_gates(tree, scenario_matrix(tree, probabilities, events), rare_event=rare_event)
+    return {tree.names[node]: values[node] for node in tree.order if tree.types[node] != 'basic'}
+
+
+# Monte Carlo uncertainty propagation
+
+def normal_quantiles(u):
+    """
+    Returns standard normal quantiles for an array of probabilities using Acklam's rational approximation (relative error below 1.2e-9).
+    """
+    a = [-3.969683028665376e+01, 2.209460984245205e+02, -2.759285104469687e+02, 1.383577518672690e+02, -3.066479806614716e+01, 2.506628277459239e+00]
+    b = [-5.447609879822406e+01, 1.615858368580409e+02, -1.556989798598866e+02, 6.680131188771972e+01, -1.328068155288572e+01]
+    c = [-7.784894002430293e-03, -3.223964580411365e-01, -2.400758277161838e+00, -2.549732539343734e+00, 4.374664141464968e+00, 2.938163982698783e+00]
+    d = [7.784695709041462e-03, 3.224671290700398e-01, 2.445134137142996e+00, 3.754408661907416e+00]
+    u = np.clip(np.asarray(u, dtype=float), 1e-300, 1 - 1e-16)
+    z = np.empty_like(u)
+    low, high = u < 0.02425, u > 1 - 0.02425
+    middle = ~(low | high)
+    q = u[middle] - 0.5
+    r = q * q
+    z[middle] = (((((a[0]*r + a[1])*r + a[2])*r + a[3])*r + a[4])*r + a[5])*q / (((((b[0]*r + b[1])*r + b[2])*r + b[3])*r + b[4])*r + 1)
+    for mask, sign, tail in ((low, 1, u[low]), (high, -1, 1 - u[high])):
+        q = np.sqrt(-2 * np.log(tail))
+        z[mask] = sign * (((((c[0]*q + c[1])*q + c[2])*q + c[3])*q + c[4])*q + c[5]) / ((((d[0]*q + d[1])*q + d[2])*q + d[3])*q + 1)
+    return z
+
+
+def beta_cdf(x, a, b, iterations=300):
+    """
+    Returns the regularized incomplete beta function for an array of points by its continued fraction (modified Lentz method).
+    """
+    x = np.asarray(x, dtype=float)
+    flip = x > (a + 1) / (a + b + 2)
+    xs = np.where(flip, 1 - x, x)
+    aa, bb = np.where(flip, b, a), np.where(flip, a, b)
+    tiny = 1e-300
+    qab, qap, qam = aa + bb, aa + 1, aa - 1
+    c = np.ones_like(xs)
+    d = 1 - qab * xs / qap
+    d = 1 / np.where(np.abs(d) < tiny, tiny, d)
+    h = d.copy()
+    for m in range(1, iterations + 1):
+        m2 = 2 * m
+        for numerator in (m * (bb - m) * xs / ((qam + m2) * (aa + m2)), -(aa + m) * (qab + m) * xs / ((aa + m2) * (qap + m2))):
+            d = 1 + numerator * d
+            d = 1 / np.where(np.abs(d) < tiny, tiny, d)
+            c = 1 + numerator / c
+            c = np.where(np.abs(c) < tiny, tiny, c)
+            h *= d * c
+    with np.errstate(divide='ignore'):
+        log_front = np.array([math.lgamma(p + q) - math.lgamma(p) - math.lgamma(q) for p, q in zip(np.ravel(aa), np.ravel(bb))]).reshape(xs.shape) + aa * np.log(xs) + bb * np.log1p(-xs)
+    value = np.exp(log_front) * h / aa
+    return np.where(flip, 1 - value, value)
+
+
+def beta_quantiles(u, a, b):
+    """
+    Returns beta distribution quantiles by interpolating the inverse of the cumulative distribution tabulated on a grid that is geometrically dense near 0 and 1.
+    """
+    tail = np.logspace(-15, np.log10(0.5), 2000)
+    grid = np.concatenate(([0.0], tail, 1 - tail[::-1][1:], [1.0]))
+    cdf = np.concatenate(([0.0], beta_cdf(grid[1:-1], float(a), float(b)), [1.0]))
+    cdf = np.maximum.accumulate(cdf)
+    return np.interp(u, cdf, grid)
+
+
+def sample_distribution(distribution, u):
+    """
+    Returns basic event probabilities or task durations for an array of uniform variates by inverting the distribution.
+
+    Distributions are given as ``("lognormal", median, error factor)`` where the error factor is the ratio of the 95th percentile to the median, ``("beta", a, b)``, ``("uniform", low, high)`` or a fixed value. Lognormal samples are capped at 1. Task durations may also be given as ``("triangular", low, most likely, high)`` or ``("pert", low, most likely, high)``, the PERT beta distribution with shape parameters ``1 + 4 (most likely - low) / (high - low)`` and ``1 + 4 (high - most likely) / (high - low)``.
+    """
+    if not isinstance(distribution, (tuple, list)):
+        return np.full_like(u, float(distribution))
+    kind = str(distribution[0]).lower()
+    if kind == 'lognormal':
+        median, error_factor = distribution[1], distribution[2]
+        return np.minimum(median * np.exp(np.log(error_factor) / 1.6448536269514722 * normal_quantiles(u)), 1.0)
+    if kind == 'beta':
+        return beta_quantiles(u, distribution[1], distribution[2])
+    if kind == 'uniform':
+        return distribution[1] + (distribution[2] - distribution[1]) * u
+    if kind == 'point':
+        return np.full_like(u, float(distribution[1]))
+    if kind in ('triangular', 'pert'):
+        low, mode, high = (float(value) for value in distribution[1:4])
+        if high <= low:
+            return np.full_like(u, low)
+        if kind == 'pert':
+            return low + (high - low) * beta_quantiles(u, 1 + 4 * (mode - low) / (high - low), 1 + 4 * (high - mode) / (high - low))
+        split = (mode - low) / (high - low)
+        return np.where(u < split, low + np.sqrt(u * (high - low) * (mode - low)), high - np.sqrt((1 - u) * (high - low) * (high - mode)))
+    raise ErrorMsg(f"Exception: Unknown distribution {distribution[0]}")
+
+
+def sample_basic_events(distributions, samples, rng, latin_hypercube=False):
+    """
+    Returns an array with one row of sampled probabilities per distribution. With Latin hypercube sampling each row takes one variate from each of ``samples`` equal probability strata, in random order.
+    """
+    u = rng.random((len(distributions), samples))
+    if latin_hypercube:
+        u = (rng.permuted(np.tile(np.arange(samples), (len(distributions), 1)), axis=1) + u) / samples
+    return np.array([sample_distribution(distribution, row) for distribution, row in zip(distributions, u)]).reshape(len(distributions), samples)
+
+
+def monte_carlo_block(tree, distributions, samples, seed, latin_hypercube=False, method='bdd'):
+    """
+    Samples one block of basic event probabilities and returns the top event probability of every sample. This is the unit of work sent to each worker process.
+    """
+    rng = np.random.default_rng(seed)
+    if method == 'bdd':
+        bdd = fault_tree_bdd(tree)
+        event_samples = sample_basic_events([distributions[event] for event in bdd.variables], samples, rng, latin_hypercube)
+        return bdd.probability_samples(event_samples)
+    events = tree.event_names
+    event_samples = sample_basic_events([distributions[event] for event in events], samples, rng, latin_hypercube)
+    return fault_tree_probabilities(tree, event_samples.T, events=events)[tree.top_name]
+
+
+def fault_tree_monte_carlo(fault_tree, distributions=None, samples=10000, seed=None, latin_hypercube=False, workers=None, percentiles=(5, 50, 95), bins=50, method='bdd', block_size=100000):
+    """
+    Propagates basic event probability uncertainty to the top event by Monte Carlo sampling.
+
+    Parameters
+    ----------
+    fault_tree : list of tuples or FaultTree
+        A fault tree in the form taken by ``draw_fault_tree_diagram_quantitative``.
+    distributions : dictionary, optional
+        Basic event probability distributions keyed by event name, each given as ``("lognormal", median, error factor)``, ``("beta", a, b)``, ``("uniform", low, high)`` or a fixed probability. Basic events without a distribution keep the probability given in the fault tree.
+    samples : int, optional
+        The number of samples. The default is 10000.
+    seed : int, optional
+        A seed for reproducible results. Samples are drawn in blocks of ``block_size`` with one random stream per block, so the result for a seed is the same for any number of workers.
+    latin_hypercube : boolean, optional
+        Use Latin hypercube sampling within each block instead of simple random sampling.
+    workers : int, optional
+        The number of worker processes to sample the blocks in parallel.
+    percentiles : tuple of numbers, optional
+        The percentiles of the top event probability to report. The default is (5, 50, 95).
+    bins : int, optional
+        The number of histogram bins. The default is 50.
+    method : string, optional
+        ``'bdd'`` (the default) evaluates the exact top event probability of every sample on the binary decision diagram, ``'gates'`` evaluates the gates directly as if their inputs were independent, which is faster on very large trees.
+    block_size : int, optional
+        The number of samples drawn and evaluated as one vectorized block.
+
+    Returns
+    -------
+    results : dictionary
+        The ``'mean'``, ``'std'``, a dictionary of ``'percentiles'``, the ``'histogram'`` as a tuple of counts and bin edges, and the top event probability ``'samples'``.
+
+    """
+    tree = as_fault_tree(fault_tree)
+    merged = basic_event_probabilities(tree)
+    if distributions is not None:
+        merged.update(distributions)
+    missing = [event for event in tree.event_names if event not in merged]
+    if missing:
+        raise ErrorMsg(f"Exception: Missing probabilities or distributions for basic events {missing}")
+    if method not in ('bdd', 'gates'):
+        raise ErrorMsg(f"Exception: Unknown Monte Carlo method {method}")
+    if method == 'bdd':
+        fault_tree_bdd(tree)  # compile once before the tree is sent to any workers
+
+    block_sizes = [block_size] * (samples // block_size) + ([samples % block_size] if samples % block_size else [])
+    seeds = np.random.SeedSequence(seed).spawn(len(block_sizes))
+    if workers is not None and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(monte_carlo_block, tree, merged, size, block_seed, latin_hypercube, method) for size, block_seed in zip(block_sizes, seeds)]
+            top_samples = np.concatenate([future.result() for future in futures])
+    else:
+        top_samples = np.concatenate([monte_carlo_block(tree, merged, size, block_seed, latin_hypercube, method) for size, block_seed in zip(block_sizes, seeds)])
+
+    return {'mean': top_samples.mean(),
+            'std': top_samples.std(),
+            'percentiles': dict(zip(percentiles, np.percentile(top_samples, percentiles))),
+            'histogram': np.histogram(top_samples, bins=bins),
+            'samples': top_samples}
+
+
+# importance measures
+
+def importance_measures(fault_tree, probabilities=None, method='bdd', cutsets=None):
+    """
+    Returns the Birnbaum, Fussell-Vesely, risk achievement worth (RAW) and risk reduction worth (RRW) importance of every basic event in one pass.
+
+    Parameters
+    ----------
+    fault_tree : list of tuples or FaultTree
+        A fault tree in the form taken by ``draw_fault_tree_diagram_quantitative``.
+    probabilities : dictionary, optional
+        Basic event probabilities keyed by event name that override those in the fault tree.
+    method : string, optional
+        ``'bdd'`` (the default) computes exact measures from the derivatives of the top event probability on the binary decision diagram. ``'cutsets'`` uses the rare event approximation over the minimal cutsets, summing the probability of the cutsets that contain each event in one pass over the cutsets.
+    cutsets : list of lists, optional
+        Minimal cutsets from ``mocus`` to use with ``method='cutsets'``. They are generated if not given.
+
+    Returns
+    -------
+    importances : pandas DataFrame
+        One row per basic event with its probability and the four measures, sorted by decreasing Fussell-Vesely importance. With top event probability P, event probability p and Birnbaum importance B, the conditional probabilities are P1 = P + (1 - p) B and P0 = P - p B, Fussell-Vesely is (P - P0) / P, RAW is P1 / P and RRW is P / P0.
+
+    """
+    tree = as_fault_tree(fault_tree)
+    merged = basic_event_probabilities(tree)
+    if probabilities is not None:
+        merged.update(probabilities)
+    events = tree.event_names
+    missing = [event for event in events if event not in merged]
+    if missing:
+        raise ErrorMsg(f"Exception: Missing probabilities for basic events {missing}")
+
+    if method == 'bdd':
+        bdd = fault_tree_bdd(tree)
+        top_probability, importances = bdd.birnbaum_importances(merged)
+        birnbaum = dict(zip(bdd.variables, importances))
+    elif method == 'cutsets':
+        if cutsets is None:
+            cutsets = mocus(tree)
+        top_probability = 0.0
+        containing = dict.fromkeys(events, 0.0)  # summed probability of the cutsets that contain each event
+        for cutset in cutsets:
+            probability = math.prod(merged[event] for event in cutset)
+            top_probability += probability
+            for event in cutset:
+                containing[event] += probability
+        birnbaum = {event: containing[event] / merged[event] if merged[event] else 0.0 for event in events}
+    else:
+        raise ErrorMsg(f"Exception: Unknown importance method {method}")
+
+    rows = []
+    for event in events:
+        p, b = merged[event], birnbaum.get(event, 0.0)
+        with_event = top_probability + (1 - p) * b
+        without_event = top_probability - p * b
+        rows.append({'Event': event,
+                     'Probability': p,
+                     'Birnbaum': b,
+                     'Fussell-Vesely': (top_probability - without_event) / top_probability if top_probability else 0.0,
+                     'RAW': with_event / top_probability if top_probability else float('inf'),
+                     'RRW': top_probability / without_event if without_event > 0 else float('inf')})
+    return pd.DataFrame(rows).set_index('Event').sort_values('Fussell-Vesely', ascending=False)
+
+
+class QuantifiedFaultTree(object):
+    """
+    A fault tree with cached gate probabilities for interactive what-if analysis.
+
+    Gates are evaluated once when the object is created, with the same formulas as draw_fault_tree_diagram_quantitative by default. When basic event probabilities are changed with ``update``, only the gates on the paths from those events to the top are recomputed, in topological order, and propagation stops at any gate whose probability does not change, so each edit costs time proportional to the affected paths rather than the tree size.
+
+    Parameters
+    ----------
+    fault_tree : list of tuples or FaultTree
+        A fault tree in the form taken by ``draw_fault_tree_diagram_quantitative``.
+    probabilities : dictionary, optional
+        Basic event probabilities keyed by event name that override those in the fault tree.
+    rare_event : boolean, optional
+        Add the probabilities of "or" gate inputs as draw_fault_tree_diagram_quantitative does (the default), or combine their complements if False.
+    """
+
+    def __init__(self, fault_tree, probabilities=None, rare_event=True):
+        self.tree = as_fault_tree(fault_tree)
+        self.rare_event = rare_event
+        tree = self.tree
+        self.position = {node: position for position, node in enumerate(tree.order)}
+        self.parents = [[] for node in tree.names]
+        for node in tree.order:
+            for child in tree.children(node):
+                self.parents[child].append(node)
+        merged = basic_event_probabilities(tree)
+        if probabilities is not None:
+            merged.update(probabilities)
+        self.values = [None] * len(tree.names)
+        for node in tree.order:
+            if tree.types[node] == 'basic':
+                if tree.names[node] not in merged:
+                    raise ErrorMsg(f"Exception: Missing probability for basic event {tree.names[node]}")
+                self.values[node] = merged[tree.names[node]]
+            else:
+                self.values[node] = self.evaluate(node)
+
+    def evaluate(self, node):
+        """
+        Returns the probability of a gate from the cached probabilities of its inputs.
+        """
+        tree = self.tree
+        inputs = [self.values[child] for child in tree.children(node)]
+        k = tree.thresholds[node]
+        if tree.types[node] == 'and':
+            return math.prod(inputs)
+        if k is not None:
+            return voting_probability(inputs, k)
+        if self.rare_event:
+            return sum(inputs)
+        return 1 - math.prod(1 - p for p in inputs)
+
+    def update(self, probabilities):
+        """
+        Changes the probabilities of one or more basic events given as a dictionary keyed by event name and recomputes only the affected gates.
+
+        Returns the names of the gates whose probabilities changed.
+        """
+        tree = self.tree
+        pending = []  # heap of (topological position, node) so every gate is recomputed after its changed inputs
+        queued = set()
+        for event, probability in probabilities.items():
+            node = tree.node_ids[event]
+            if tree.types[node] != 'basic':
+                raise ErrorMsg(f"Exception: Only basic event probabilities can be updated, not gate {event}")
+            if self.values[node] == probability:
+                continue
+            self.values[node] = probability
+            for parent in self.parents[node]:
+                if parent not in queued:
+                    queued.add(parent)
+                    heapq.heappush(pending, (self.position[parent], parent))
+        changed = []
+        while pending:
+            position, node = heapq.heappop(pending)
+            value = self.evaluate(node)
+            if value == self.values[node]:
+                continue
+            self.values[node] = value
+            changed.append(tree.names[node])
+            for parent in self.parents[node]:
+                if parent not in queued:
+                    queued.add(parent)
+                    heapq.heappush(pending, (self.position[parent], parent))
+        return changed
+
+    def probability(self, name=None):
+        """
+        Returns the cached probability of an event, the top event by default.
+        """
+        return self.values[self.tree.node_ids[self.tree.top_name if name is None else name]]
+
+    def gate_probabilities(self):
+        return {self.tree.names[node]: self.values[node] for node in self.tree.order if self.tree.types[node] != 'basic'}
+
+    def diagram(self, filename=None, format='svg'):
+        """
+        Returns the fault tree diagram labeled with the cached probabilities. Rendering is only done when asked for, not on every update.
+        """
+        tree = self.tree
+        events_quant_dict = {tree.names[node]: {'type': tree.types[node], 'prob': self.values[node], 'branches': [tree.names[child] for child in tree.children(node)]} for node in reversed(tree.order)}
+        return labeled_fault_tree_diagram(events_quant_dict, filename=filename, format=format)
+
+
+# time-dependent unavailability
+
+class ReliabilityModel(abc.ABC):
+    """
+    A basic event model that gives its unavailability over time. A model can be used in place of a basic event probability in the quantitative fault tree form, such as ``("Pump fails", "basic", ConstantFailureRate(1e-4))``.
+    """
+
+    @abc.abstractmethod
+    def unavailability(self, times):
+        """Returns the probability that the component is unavailable at each of the times."""
+
+
+class ConstantFailureRate(ReliabilityModel):
+    """
+    A non-repairable component with a constant failure rate, unavailable with probability ``1 - exp(-failure_rate t)``.
+    """
+
+    def __init__(self, failure_rate):
+        self.failure_rate = failure_rate
+
+    def unavailability(self, times):
+        return -np.expm1(-self.failure_rate * np.asarray(times, dtype=float))
+
+
+class RepairableComponent(ReliabilityModel):
+    """
+    A component with constant failure and repair rates, unavailable with probability ``failure_rate / (failure_rate + repair_rate) (1 - exp(-(failure_rate + repair_rate) t))``.
+    """
+
+    def __init__(self, failure_rate, repair_rate):
+        self.failure_rate = failure_rate
+        self.repair_rate = repair_rate
+
+    def unavailability(self, times):
+        total_rate = self.failure_rate + self.repair_rate
+        return self.failure_rate / total_rate * -np.expm1(-total_rate * np.asarray(times, dtype=float))
+
+
+class PeriodicallyTested(ReliabilityModel):
+    """
+    A standby component with a constant failure rate that is tested and restored every ``test_interval``, starting at ``first_test`` (one test interval by default). Its unavailability ``1 - exp(-failure_rate s)`` grows with the time s since the last test.
+    """
+
+    def __init__(self, failure_rate, test_interval, first_test=None):
+        self.failure_rate = failure_rate
+        self.test_interval = test_interval
+        self.first_test = test_interval if first_test is None else first_test
+
+    def unavailability(self, times):
+        times = np.asarray(times, dtype=float)
+        since_test = np.where(times < self.first_test, times, np.mod(times - self.first_test, self.test_interval))
+        return -np.expm1(-self.failure_rate * since_test)
+
+
+def unavailability_curve(fault_tree, times, models=None, method='bdd'):
+    """
+    Returns the top event unavailability of a fault tree over a vector of time points.
+
+    Parameters
+    ----------
+    fault_tree : list of tuples or FaultTree
+        A fault tree in the form taken by ``draw_fault_tree_diagram_quantitative``, where a basic event probability may be a ``ReliabilityModel`` such as ``ConstantFailureRate``, ``RepairableComponent`` or ``PeriodicallyTested``. Basic events with a plain probability are constant over time.
+    times : array
+        The time points, in the same time units as the model rates.
+    models : dictionary, optional
+        Reliability models or probabilities keyed by basic event name that override those in the fault tree.
+    method : string, optional
+        ``'bdd'`` (the default) gives the exact unavailability on the binary decision diagram, ``'gates'`` evaluates the gates directly as if their inputs were independent. Either way every node is evaluated once for all time points as a vectorized operation.
+
+    Returns
+    -------
+    results : dictionary
+        The ``'times'``, the ``'unavailability'`` curve, its ``'peak'`` value and ``'peak_time'``, and the time-averaged ``'mean'`` unavailability (trapezoidal rule over the time points).
+
+    """
+    tree = as_fault_tree(fault_tree)
+    times = np.atleast_1d(np.asarray(times, dtype=float))
+    merged = basic_event_probabilities(tree)
+    if models is not None:
+        merged.update(models)
+    missing = [event for event in tree.event_names if event not in merged]
+    if missing:
+        raise ErrorMsg(f"Exception: Missing models or probabilities for basic events {missing}")
+    curve_of = lambda model: model.unavailability(times) if isinstance(model, ReliabilityModel) else np.full(times.shape, float(model))
+
+    if method == 'bdd':
+        bdd = fault_tree_bdd(tree)
+        curve = bdd.probability_samples(np.array([curve_of(merged[event]) for event in bdd.variables]).reshape(len(bdd.variables), len(times)))
+    elif method == 'gates':
+        values = np.zeros((len(tree.names), len(times)))
+        for event in tree.event_names:
+            values[tree.node_ids[event]] = curve_of(merged[event])
+        curve = evaluate_gates(tree, values)[tree.node_ids[tree.top_name]]
+    else:
+        raise ErrorMsg(f"Exception: Unknown unavailability method {method}")
+
+    if len(times) > 1 and times[-1] > times[0]:
+        mean = ((curve[1:] + curve[:-1]) / 2 * np.diff(times)).sum() / (times[-1] - times[0])
+    else:
+        mean = curve.mean()
+    peak = int(np.argmax(curve))
+    return {'times': times, 'unavailability': curve, 'peak': curve[peak], 'peak_time': times[peak], 'mean': mean}
+
+
+# vectorized cutset quantification
+
+class CutsetMatrix(object):
+    """
+    A sparse cutset x event incidence matrix in compressed sparse row (CSR) form, built once from a list of minimal cutsets and reused to quantify any number of probability scenarios.
+
+    Row ``i`` holds the event columns ``indices[indptr[i]:indptr[i + 1]]`` of cutset ``i``. Cutset probabilities are computed in log space as one gather of the log event probabilities and one segmented sum per cutset row.
+
+    Parameters
+    ----------
+    cutsets : list of lists
+        Minimal cutsets as lists of event names, as returned by ``mocus``.
+    events : list of strings, optional
+        The basic event name of each probability column. Defaults to the events in order of first appearance in the cutsets.
+    """
+
+    def __init__(self, cutsets, events=None):
+        if events is None:
+            events = list(dict.fromkeys(event for cutset in cutsets for event in cutset))
+        self.events = list(events)
+        self.event_ids = {event: column for column, event in enumerate(self.events)}
+        self.cutsets = [list(cutset) for cutset in cutsets]
+        if any(len(cutset) == 0 for cutset in self.cutsets):
+            raise ErrorMsg("Exception: Cutsets must contain at least one event")
+        self.indices = np.array([self.event_ids[event] for cutset in self.cutsets for event in cutset], dtype=np.intp)
+        self.indptr = np.concatenate(([0], np.cumsum([len(cutset) for cutset in self.cutsets]))).astype(np.intp)
+
+    def scenarios(self, probabilities):
+        """
+        Returns an (n_scenarios x n_events) array from an array, a pandas DataFrame with a column per event, or a dictionary of event probabilities for a single scenario.
+        """
+        if isinstance(probabilities, dict):
+            missing = [event for event in self.events if event not in probabilities]
+            if missing:
+                raise ErrorMsg(f"Exception: Missing probabilities for basic events {missing}")
+            probabilities = [[probabilities[event] for event in self.events]]
+        elif isinstance(probabilities, pd.DataFrame):
+            probabilities = probabilities[self.events].to_numpy(dtype=float)
+        probabilities = np.atleast_2d(np.asarray(probabilities, dtype=float))
+        if probabilities.shape[1] != len(self.events):
+            raise ErrorMsg(f"Exception: Expected {len(self.events)} event columns, got {probabilities.shape[1]}")
+        return probabilities
+
+    def blocks(self, probabilities, budget=2**18):
+        """
+        Yields ``(scenarios, cutsets, log_probabilities)`` for blocks of scenario rows and cutset rows, where ``log_probabilities`` is the (n_cutsets x n_scenarios) block of natural logarithms of the cutset probabilities.
+
+        The log event probabilities are transposed once so that every gathered cutset event is a contiguous row, and each block gathers at most ``budget`` elements, or one cutset of one scenario, before the segmented sum over its cutset rows.
+        """
+        probabilities = self.scenarios(probabilities)
+        with np.errstate(divide='ignore'):
+            log_probabilities = np.ascontiguousarray(np.log(probabilities).T)
+        if not len(self.cutsets):
+            return
+        order = int(np.diff(self.indptr).max())
+        height = max(1, budget // order)
+        for first in range(0, len(self.cutsets), height):
+            last = min(first + height, len(self.cutsets))
+            indices = self.indices[self.indptr[first]:self.indptr[last]]
+            offsets = self.indptr[first:last] - self.indptr[first]
+            width = max(1, budget // len(indices))
+            for start in range(0, probabilities.shape[0], width):
+                scenarios = slice(start, start + width)
+                yield scenarios, slice(first, last), np.add.reduceat(log_probabilities[indices, scenarios], offsets, axis=0)
+
+    def log_cutset_probabilities(self, probabilities, budget=2**18):
+        """
+        Returns the full (n_scenarios x n_cutsets) natural logarithms of the cutset probabilities. ``quantify`` reduces the blocks as they are computed instead of keeping them all.
+        """
+        probabilities = self.scenarios(probabilities)
+        log_cutsets = np.zeros((probabilities.shape[0], len(self.cutsets)))
+        for scenarios, cutsets, block in self.blocks(probabilities, budget):
+            log_cutsets[scenarios, cutsets] = block.T
+        return log_cutsets
+
+    def quantify(self, probabilities, cutset_probabilities=False, budget=2**18):
+        """
+        Returns the rare event approximation and the min-cut upper bound for every scenario, and optionally the probability of every cutset.
+
+        The cutset probabilities are computed in blocks of at most ``budget`` gathered elements (see ``blocks``) and summed into the results block by block, so memory use does not grow with the number of cutsets times the number of scenarios unless ``cutset_probabilities`` is requested.
+
+        Returns
+        -------
+        results : dictionary
+            The ``'rare_event'`` sum of cutset probabilities and the ``'mcub'`` min-cut upper bound ``1 - (1 - P(C1))(1 - P(C2))...`` of each scenario, and with ``cutset_probabilities=True`` the (n_scenarios x n_cutsets) ``'cutset_probabilities'``.
+        """
+        probabilities = self.scenarios(probabilities)
+        rare_event = np.zeros(probabilities.shape[0])
+        log_complement = np.zeros(probabilities.shape[0])
+        if cutset_probabilities:
+            cutset_probabilities = np.zeros((probabilities.shape[0], len(self.cutsets)))
+        for scenarios, cutsets, block in self.blocks(probabilities, budget):
+            block = np.exp(block)
+            rare_event[scenarios] += block.sum(axis=0)
+            with np.errstate(divide='ignore'):
+                log_complement[scenarios] += np.log1p(-np.minimum(block, 1.0)).sum(axis=0)
+            if cutset_probabilities is not False:
+                cutset_probabilities[scenarios, cutsets] = block.T
+        results = {'rare_event': rare_event, 'mcub': np.abs(np.expm1(log_complement))}  # 1 - exp(x) for x <= 0, without a negative zero
+        if cutset_probabilities is not False:
+            results['cutset_probabilities'] = cutset_probabilities
+        return results
+
+
+def quantify_cutsets(cutsets, probabilities, events=None, cutset_probabilities=False):
+    """
+    Returns the rare event approximation and min-cut upper bound, and optionally the cutset probabilities, of a list of minimal cutsets for a batch of probability scenarios.
+
+    Parameters
+    ----------
+    cutsets : list of lists
+        Minimal cutsets as lists of event names, as returned by ``mocus``.
+    probabilities : array, DataFrame or dictionary
+        An (n_scenarios x n_events) array of basic event probabilities with columns in the order of ``events``, a pandas DataFrame with a column per event, or a dictionary of event probabilities for a single scenario.
+    events : list of strings, optional
+        The basic event name of each array column. Defaults to the events in order of first appearance in the cutsets.
+    cutset_probabilities : boolean, optional
+        Also return the (n_scenarios x n_cutsets) probability of every cutset.
+
+    Returns
+    -------
+    results : dictionary
+        See ``CutsetMatrix.quantify``. Build a ``CutsetMatrix`` once to quantify the same cutsets repeatedly.
+
+    """
+    return CutsetMatrix(cutsets, events).quantify(probabilities, cutset_probabilities)
+
+
+# cutset cache: results are keyed by a Merkle hash of the sub-tree structure, so
+# the key does not depend on gate names or on the order of rows and branches
+
+def subtree_hashes(fault_tree, probabilities=None):
+    """
+    Returns a dictionary of the canonical hash of the sub-tree below every event of a fault tree.
+
+    A basic event hashes its name, and its probability when a ``probabilities`` dictionary is given. A gate hashes its type and the sorted hashes of its branches, so the hash is independent of gate names and of the order of the rows and branches, and identical sub-trees get identical hashes wherever they appear.
+    """
+    tree = as_fault_tree(fault_tree)
+    hashes = [None] * len(tree.names)
+    for node in tree.order:
+        if tree.is_gate(node):
+            children = sorted(hashes[child] for child in tree.children(node))
+            text = f"{tree.types[node]}({','.join(children)})"
+        else:
+            name = tree.names[node]
+            text = repr(name) if probabilities is None else f"{name!r}:{probabilities.get(name)!r}"
+        hashes[node] = hashlib.sha256(text.encode()).hexdigest()
+    return {tree.names[node]: hashes[node] for node in tree.order}
+
+
+def fault_tree_hash(fault_tree):
+    """
+    Returns the canonical hash of a fault tree after normalize_fault_tree, which is the same for fault trees with the same cutsets written with different gate names, row orders, branch orders or redundant single-input gates.
+    """
+    normalized = normalize_fault_tree(fault_tree)
+    return subtree_hashes(normalized)[normalized[0][0]]
+
+
+class CutsetCache:
+    """
+    A least recently used cache of minimal cutsets keyed by the canonical hash of each fault tree module, with an optional on-disk store shared between sessions.
+
+    Pass it to ``mocus`` or ``fault_tree_cutsets`` as ``cache=``. The fault tree is normalized and split into modules, and every module whose sub-tree has been solved before with the same truncation is read back instead of expanded. Access is guarded by a lock, so one cache can be shared between threads.
+
+    Parameters
+    ----------
+    maxsize : int, optional
+        The largest number of module results kept in memory. The default is 128.
+    directory : string, optional
+        A directory in which every result is also stored as a pickle file named by its key, and from which results missing in memory are loaded.
+
+    """
+    def __init__(self, maxsize=128, directory=None):
+        self.maxsize = maxsize
+        self.directory = directory
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    @staticmethod
+    def key(subtree_hash, max_order=None, cutoff=None):
+        return hashlib.sha256(f"{subtree_hash}|{max_order!r}|{cutoff!r}".encode()).hexdigest()
+
+    def path(self, key):
+        return os.path.join(self.directory, key + '.pkl')
+
+    def get(self, key):
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return self.entries[key]
+            if self.directory is not None and exists(self.path(key)):
+                with open(self.path(key), 'rb') as file:
+                    value = pickle.load(file)
+                self.disk_hits += 1
+                self.store(key, value)
+                return value
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self.lock:
+            self.store(key, value)
+            if self.directory is not None:
+                temporary = f"{self.path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(temporary, 'wb') as file:
+                    pickle.dump(value, file, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(temporary, self.path(key))  # atomic, so concurrent jobs never read a partial file
+
+    def store(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        """Empties the in-memory cache and resets the statistics, leaving the on-disk store in place."""
+        with self.lock:
+            self.entries.clear()
+            self.hits = self.disk_hits = self.misses = 0
+
+    def statistics(self):
+        """Returns a dictionary of the memory hits, disk hits, misses, hit rate and current and maximum size."""
+        with self.lock:
+            lookups = self.hits + self.disk_hits + self.misses
+            return {'hits': self.hits, 'disk_hits': self.disk_hits, 'misses': self.misses,
+                    'hit_rate': (self.hits + self.disk_hits) / lookups if lookups else 0.0,
+                    'size': len(self.entries), 'maxsize': self.maxsize}
+
+
+# event trees: accident sequences through success and failure branches of
+# headings, each heading failure being the top event of a fault tree
+
+class EventTree(object):
+    """
+    An event tree of accident sequences following an initiating event, whose branch points (headings) are fault trees.
+
+    The minimal cutsets of every heading's fault tree are generated once and held as event masks, modules shared between heading fault trees are solved once through a CutsetCache, and the products of failed headings are memoized so sequences that fail the same headings share the work. A success branch is handled by delete-term logic: a sequence cutset that contains a cutset of a heading on a success branch is removed, since that heading would then have failed.
+
+    Parameters
+    ----------
+    initiating_event : tuple
+        The initiating event name and frequency in the form ``("initiating event name", frequency)``.
+    headings : dictionary
+        The fault tree of each heading keyed by heading name, in the form taken by ``mocus``. The top event of each fault tree is the failure of the heading.
+    sequences : list of tuples
+        The sequences in the form ``("sequence name", list of branches, "end state")``, with the end state optional and the branches as a list of ``("heading name", "success")`` or ``("heading name", "failure")`` pairs. Headings a sequence does not pass through are left out.
+    max_order : int, optional
+        The largest number of basic events allowed in a heading or sequence cutset, not counting the initiating event.
+    cutoff : float, optional
+        The smallest cutset probability kept, given the initiating event.
+    cache : CutsetCache, optional
+        A cache of fault tree module cutsets, which can be shared between event trees. By default each event tree has its own.
+
+    """
+
+    def __init__(self, initiating_event, headings, sequences, max_order=None, cutoff=None, cache=None):
+        self.initiating_event, self.frequency = initiating_event
+        self.headings = dict(headings)
+        self.max_order = max_order
+        self.cutoff = cutoff
+        self.cache = cache if cache is not None else CutsetCache()
+        self.sequences = []
+        for sequence in sequences:
+            name, branches = sequence[0], sequence[1]
+            end_state = sequence[2] if len(sequence) > 2 else None
+            failed, succeeded = [], []
+            for heading, state in branches:
+                if heading not in self.headings:
+                    raise ErrorMsg(f"Exception: Sequence {name} refers to unknown heading {heading}")
+                if str(state).lower() not in ('success', 'failure'):
+                    raise ErrorMsg(f"Exception: Branch state must be 'success' or 'failure', not {state}")
+                (failed if str(state).lower() == 'failure' else succeeded).append(heading)
+            self.sequences.append((name, tuple(sorted(set(failed))), frozenset(succeeded), end_state))
+
+        self.probabilities = {}
+        for fault_tree in self.headings.values():
+            self.probabilities.update(basic_event_probabilities(fault_tree))
+        self.events = []
+        self.event_ids = {}
+        self.heading_masks = {}
+        self.failure_masks = {}
+        self.success_tries = {}
+        self._sequence_masks = None
+        self._matrix = None
+        self._sequence_pointers = None
+
+    def mask_probability(self, mask):
+        probability = 1.0
+        for event in bits(mask):
+            probability *= self.probabilities[self.events[event]]
+        return probability
+
+    def heading_cutsets(self, heading):
+        """
+        Returns the minimal cutset masks of a heading's fault tree, generating them on first use.
+        """
+        if heading not in self.heading_masks:
+            masks = []
+            for cutset in mocus(self.headings[heading], max_order=self.max_order, cutoff=self.cutoff, probabilities=self.probabilities or None, cache=self.cache):
+                mask = 0
+                for event in cutset:
+                    if event not in self.event_ids:
+                        self.event_ids[event] = len(self.events)
+                        self.events.append(event)
+                    mask |= 1 << self.event_ids[event]
+                masks.append(mask)
+            self.heading_masks[heading] = masks
+        return self.heading_masks[heading]
+
+    def failure_cutsets(self, failed):
+        """
+        Returns the minimal cutset masks of the failure of all the headings in a sorted tuple, built from the memoized result for all but the last heading.
+        """
+        if failed not in self.failure_masks:
+            if not failed:
+                self.failure_masks[failed] = [0]
+            else:
+                products = set()
+                for prefix_mask in self.failure_cutsets(failed[:-1]):
+                    for heading_mask in self.heading_cutsets(failed[-1]):
+                        mask = prefix_mask | heading_mask
+                        if self.max_order is not None and bit_count(mask) > self.max_order:
+                            continue
+                        if self.cutoff is not None and self.mask_probability(mask) < self.cutoff:
+                            continue
+                        products.add(mask)
+                self.failure_masks[failed] = minimize_cutset_masks(products)
+        return self.failure_masks[failed]
+
+    def success_trie(self, succeeded):
+        """
+        Returns a trie of the cutsets of all the headings in a set of success branches, used to delete the sequence cutsets that would fail them.
+        """
+        if succeeded not in self.success_tries:
+            trie = {}
+            for heading in succeeded:
+                for mask in self.heading_cutsets(heading):
+                    node = trie
+                    for key in bits(mask):
+                        node = node.setdefault(key, {})
+                    node[None] = True
+            self.success_tries[succeeded] = trie
+        return self.success_tries[succeeded]
+
+    def sequence_masks(self):
+        if self._sequence_masks is None:
+            self._sequence_masks = []
+            for name, failed, succeeded, end_state in self.sequences:
+                trie = self.success_trie(succeeded)
+                self._sequence_masks.append([mask for mask in self.failure_cutsets(failed) if not trie_contains_subset(trie, list(bits(mask)))])
+        return self._sequence_masks
+
+    def sequence_cutsets(self):
+        """
+        Returns a dictionary of the minimal cutsets of every sequence, each starting with the initiating event.
+        """
+        return {sequence[0]: [[self.initiating_event] + cutset for cutset in masks_to_cutsets(masks, self.events)]
+                for sequence, masks in zip(self.sequences, self.sequence_masks())}
+
+    def cutset_matrix(self):
+        """
+        Returns one CutsetMatrix of the cutsets of all sequences in sequence order, with the initiating event as the last event column.
+        """
+        if self._matrix is None:
+            cutsets = [cutset for cutsets in self.sequence_cutsets().values() for cutset in cutsets]
+            self._matrix = CutsetMatrix(cutsets, events=self.events + [self.initiating_event])
+            self._sequence_pointers = np.concatenate(([0], np.cumsum([len(masks) for masks in self.sequence_masks()]))).astype(np.intp)
+        return self._matrix
+
+    def sequence_frequencies(self, probabilities=None):
+        """
+        Returns the frequency of every sequence for one or many probability scenarios in one batched pass over the cutsets of all sequences.
+
+        Parameters
+        ----------
+        probabilities : array, DataFrame or dictionary, optional
+            An (n_scenarios x n_events) array of basic event probabilities with columns in the order of the ``events`` attribute, a pandas DataFrame with a column per event, or a dictionary of event probabilities for a single scenario. Defaults to the probabilities in the heading fault trees.
+
+        Returns
+        -------
+        results : dictionary
+            The ``'sequences'`` names and the (n_scenarios x n_sequences) ``'rare_event'`` and ``'mcub'`` frequencies, each being the initiating event frequency times the rare event approximation or min-cut upper bound of the sequence cutsets.
+        """
+        matrix = self.cutset_matrix()
+        if probabilities is None:
+            probabilities = self.probabilities
+        if isinstance(probabilities, dict):
+            probabilities = {**probabilities, self.initiating_event: 1.0}
+        elif isinstance(probabilities, pd.DataFrame):
+            probabilities = probabilities.assign(**{self.initiating_event: 1.0})
+        else:
+            probabilities = np.atleast_2d(np.asarray(probabilities, dtype=float))
+            probabilities = np.hstack((probabilities, np.ones((probabilities.shape[0], 1))))
+        # segmented sums of each block over the sequences of its cutsets, which are stored in sequence order
+        pointers = self._sequence_pointers
+        sequence_ids = np.repeat(np.arange(len(self.sequences)), np.diff(pointers))
+        probabilities = matrix.scenarios(probabilities)
+        rare_event = np.zeros((probabilities.shape[0], len(self.sequences)))
+        log_complement = np.zeros_like(rare_event)
+        for scenarios, cutsets, block in matrix.blocks(probabilities):
+            block = np.exp(block)
+            ids = sequence_ids[cutsets]
+            starts = np.flatnonzero(np.r_[True, ids[1:] != ids[:-1]])
+            rare_event[scenarios, ids[starts]] += np.add.reduceat(block, starts, axis=0).T
+            with np.errstate(divide='ignore'):
+                log_complement[scenarios, ids[starts]] += np.add.reduceat(np.log1p(-np.minimum(block, 1.0)), starts, axis=0).T
+        mcub = np.abs(np.expm1(log_complement))  # 1 - exp(x) for x <= 0, without the negative zero of an empty sequence
+        return {'sequences': [sequence[0] for sequence in self.sequences],
+                'rare_event': self.frequency * rare_event,
+                'mcub': self.frequency * mcub}
+
+    def quantify(self, probabilities=None):
+        """
+        Returns a DataFrame of the end state, number of cutsets and frequency of every sequence for a single probability scenario.
+
+        The ``Frequency`` column is the rare event approximation and the ``MCUB`` column the min-cut upper bound, both including the initiating event frequency. See ``sequence_frequencies`` for many scenarios at once.
+        """
+        results = self.sequence_frequencies(probabilities)
+        return pd.DataFrame({'End State': [sequence[3] for sequence in self.sequences],
+                             'Cutsets': [len(masks) for masks in self.sequence_masks()],
+                             'Frequency': results['rare_event'][0],
+                             'MCUB': results['mcub'][0]},
+                            index=pd.Index(results['sequences'], name='Sequence'))
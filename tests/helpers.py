@@ -0,0 +1,80 @@
+import itertools
+import random
+
+import pyml
+
+
+def random_tree(seed, n_gates=8, n_events=8, fanout=3, quantitative=False, vote=False):
+    """
+    Returns a random fault tree whose gates only reference later gates, so it is acyclic, with shared events and sub-trees.
+    """
+    rng = random.Random(seed)
+    gates = [f'G{i}' for i in range(n_gates)]
+    events = [f'E{i}' for i in range(n_events)]
+    fault_tree = []
+    for i, gate in enumerate(gates):
+        candidates = gates[i + 1:] + events
+        branches = rng.sample(candidates, min(len(candidates), rng.randint(2, fanout)))
+        gate_type = rng.choice(['and', 'Or', 'OR', 'And'] + ([f'Vote {rng.randint(1, len(branches))}'] if vote else []))
+        fault_tree.append((gate, gate_type, '', branches) if quantitative else (gate, gate_type, branches))
+    for event in events:
+        fault_tree.append((event, 'basic', round(rng.uniform(0.001, 0.3), 4), []) if quantitative else (event, 'basic', []))
+    return fault_tree
+
+
+def canonical(cutsets):
+    return sorted(sorted(cutset) for cutset in cutsets)
+
+
+def occurs(fault_tree, failed):
+    """
+    Returns whether the top event occurs when exactly the ``failed`` basic events occur.
+    """
+    rows = {row[0]: row for row in pyml.fault_tree_rows(fault_tree)}
+
+    def value(name):
+        row = rows.get(name)
+        if row is None or row[1].lower() == 'basic':
+            return name in failed
+        branches = [value(branch) for branch in row[3]]
+        gate_type = row[1].lower()
+        if gate_type == 'and':
+            return all(branches)
+        if gate_type == 'or':
+            return any(branches)
+        return sum(branches) >= pyml.vote_threshold(gate_type)
+
+    return value(fault_tree[0][0])
+
+
+def basic_events(fault_tree):
+    return sorted(row[0] for row in fault_tree if row[1].lower() == 'basic')
+
+
+def brute_force_cutsets(fault_tree):
+    """
+    Returns the minimal cutsets found by evaluating the fault tree for every set of failed basic events, smallest first.
+    """
+    events = basic_events(fault_tree)
+    cutsets = []
+    for order in range(len(events) + 1):
+        for combination in itertools.combinations(events, order):
+            failed = set(combination)
+            if not any(set(cutset) <= failed for cutset in cutsets) and occurs(fault_tree, failed):
+                cutsets.append(list(combination))
+    return canonical(cutsets)
+
+
+def brute_force_probability(fault_tree, probabilities):
+    """
+    Returns the exact top event probability by summing over every state of the basic events.
+    """
+    events = basic_events(fault_tree)
+    total = 0.0
+    for states in itertools.product((False, True), repeat=len(events)):
+        weight = 1.0
+        for event, failed in zip(events, states):
+            weight *= probabilities[event] if failed else 1 - probabilities[event]
+        if occurs(fault_tree, {event for event, failed in zip(events, states) if failed}):
+            total += weight
+    return total
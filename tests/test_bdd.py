@@ -0,0 +1,58 @@
+import sys
+
+import numpy as np
+import pytest
+
+import pyml
+from helpers import brute_force_probability, random_tree
+
+SEEDS = range(20)
+
+
+def basic_probabilities(fault_tree):
+    return {row[0]: row[2] for row in fault_tree if row[1] == 'basic'}
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_probability_matches_brute_force(seed):
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True, vote=seed % 2 == 1)
+    probabilities = basic_probabilities(fault_tree)
+    expected = brute_force_probability(fault_tree, probabilities)
+    assert pyml.top_event_probability(fault_tree) == pytest.approx(expected, rel=1e-12)
+    bdd = pyml.BDD(fault_tree)
+    assert bdd.gate_probabilities()[fault_tree[0][0]] == pytest.approx(expected, rel=1e-12)
+
+    changed = {event: probability / 2 for event, probability in probabilities.items()}
+    assert bdd.probability(changed) == pytest.approx(brute_force_probability(fault_tree, changed), rel=1e-12)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_probability_samples_match_single_evaluations(seed):
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True)
+    bdd = pyml.BDD(fault_tree)
+    samples = np.random.default_rng(seed).uniform(0.0, 0.5, (len(bdd.variables), 6))
+    expected = [bdd.probability(dict(zip(bdd.variables, column))) for column in samples.T]
+    assert bdd.probability_samples(samples) == pytest.approx(expected, rel=1e-12)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_birnbaum_importance_is_the_probability_derivative(seed):
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True)
+    bdd = pyml.BDD(fault_tree)
+    probability, importances = bdd.birnbaum_importances()
+    assert probability == pytest.approx(bdd.probability())
+    for event, importance in zip(bdd.variables, importances):
+        failed = bdd.probability({event: 1.0})
+        working = bdd.probability({event: 0.0})
+        assert importance == pytest.approx(failed - working, abs=1e-12)
+
+
+def test_deep_trees_leave_the_recursion_limit_alone():
+    depth = 5000
+    fault_tree = [(f'G{i}', 'or' if i % 2 else 'and', '', [f'E{i}', f'G{i + 1}']) for i in range(depth)]
+    fault_tree += [(f'G{depth}', 'basic', 0.1, [])] + [(f'E{i}', 'basic', 0.01, []) for i in range(depth)]
+    limit = sys.getrecursionlimit()
+    bdd = pyml.BDD(fault_tree)
+    assert len(bdd.minimal_cutsets()) == depth // 2 + 1
+    assert 0.0 < bdd.probability() < 1.0
+    assert sys.getrecursionlimit() == limit
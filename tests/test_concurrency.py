@@ -0,0 +1,46 @@
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pyml
+from helpers import brute_force_cutsets, canonical, random_tree
+
+
+@pytest.fixture
+def fast_switching():
+    interval = sys.getswitchinterval()
+    sys.setswitchinterval(1e-6)
+    yield
+    sys.setswitchinterval(interval)
+
+
+def test_threads_share_fault_trees_and_cache(tmp_path, monkeypatch, fast_switching):
+    monkeypatch.chdir(tmp_path)
+    trees = [random_tree(seed, n_gates=8, n_events=9, quantitative=True) for seed in range(12)]
+    qualitative = [[(row[0], row[1], row[3]) for row in fault_tree] for fault_tree in trees]
+    expected = [brute_force_cutsets(fault_tree) for fault_tree in trees]
+    shared = [pyml.FaultTree(fault_tree) for fault_tree in trees]
+    cache = pyml.CutsetCache(maxsize=8)
+
+    def job(i):
+        i %= len(trees)
+        results = [canonical(pyml.mocus(qualitative[i], engine='list')),
+                   canonical(pyml.mocus(shared[i], engine='bitset')),
+                   canonical(pyml.mocus(shared[i], engine='bdd')),
+                   canonical(pyml.mocus(shared[i], modularize=True)),
+                   canonical(pyml.mocus(trees[i], cache=cache))]
+        assert all(result == expected[i] for result in results)
+        return (pyml.fault_tree_diagram(trees[i]).source,
+                pyml.draw_fault_tree_diagram_quantitative(shared[i]).source,
+                pyml.top_event_probability(shared[i]))
+
+    with ThreadPoolExecutor(16) as executor:
+        results = list(executor.map(job, range(240)))
+    for i, result in enumerate(results):
+        assert result == results[i % len(trees)]
+    assert os.listdir(tmp_path) == []
+    statistics = cache.statistics()
+    assert statistics['size'] <= 8
+    assert statistics['hits'] > 0
@@ -0,0 +1,44 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import pyml
+
+
+def random_cutsets(rng, events, count):
+    return [list(rng.choice(events, rng.integers(1, 5), replace=False)) for _ in range(count)]
+
+
+@pytest.mark.parametrize('budget', [1, 3, 7, 64, 2**18])
+@pytest.mark.parametrize('seed', range(10))
+def test_quantify_matches_direct_products(seed, budget):
+    rng = np.random.default_rng(seed)
+    events = [f'E{i}' for i in range(12)]
+    cutsets = random_cutsets(rng, events, int(rng.integers(1, 40)))
+    probabilities = rng.uniform(0.0, 0.5, (int(rng.integers(1, 30)), len(events)))
+    probabilities[0, 0] = 0.0  # log(0) must give a zero cutset probability
+    probabilities[-1, 1] = 1.0
+    expected = np.array([[np.prod([scenario[events.index(event)] for event in cutset]) for cutset in cutsets]
+                         for scenario in probabilities])
+
+    matrix = pyml.CutsetMatrix(cutsets, events)
+    results = matrix.quantify(probabilities, cutset_probabilities=True, budget=budget)
+    assert results['cutset_probabilities'] == pytest.approx(expected, rel=1e-12, abs=1e-300)
+    assert results['rare_event'] == pytest.approx(expected.sum(axis=1), rel=1e-12)
+    assert results['mcub'] == pytest.approx(1 - np.prod(1 - np.minimum(expected, 1.0), axis=1), rel=1e-12)
+    assert 'cutset_probabilities' not in matrix.quantify(probabilities, budget=budget)
+    with np.errstate(divide='ignore'):
+        assert np.exp(matrix.log_cutset_probabilities(probabilities, budget=budget)) == pytest.approx(expected, rel=1e-12, abs=1e-300)
+
+
+def test_scenarios_from_a_dictionary_or_a_data_frame():
+    cutsets = [['A', 'B'], ['C']]
+    single = pyml.quantify_cutsets(cutsets, {'A': 0.1, 'B': 0.2, 'C': 0.3})
+    assert single['rare_event'] == pytest.approx([0.32])
+    assert single['mcub'] == pytest.approx([1 - 0.98 * 0.7])
+    frame = pd.DataFrame({'C': [0.3, 0.0], 'B': [0.2, 0.0], 'A': [0.1, 0.0]})
+    batch = pyml.quantify_cutsets(cutsets, frame)
+    assert batch['rare_event'] == pytest.approx([0.32, 0.0])
+    assert str(batch['mcub'][1]) == '0.0'
+    with pytest.raises(pyml.ErrorMsg):
+        pyml.quantify_cutsets(cutsets, {'A': 0.1})
@@ -0,0 +1,90 @@
+import pytest
+
+import pyml
+from helpers import brute_force_cutsets, canonical, random_tree
+
+SEEDS = range(20)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_engines_match_brute_force(seed):
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True)
+    qualitative = [(row[0], row[1], row[3]) for row in fault_tree]
+    tree = pyml.FaultTree(fault_tree)
+    expected = brute_force_cutsets(fault_tree)
+    assert canonical(pyml.mocus(qualitative, engine='list')) == expected
+    assert canonical(pyml.mocus(tree, engine='bitset')) == expected
+    assert canonical(pyml.mocus(tree, engine='bdd')) == expected
+    assert canonical(pyml.mocus(tree, modularize=True)) == expected
+    assert canonical(pyml.mocus(fault_tree, normalize=True)) == expected
+    assert canonical(pyml.mocus(fault_tree, cache=pyml.CutsetCache())) == expected
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_voting_gates_match_brute_force(seed):
+    fault_tree = random_tree(seed, n_gates=7, n_events=8, fanout=4, quantitative=True, vote=True)
+    expected = brute_force_cutsets(fault_tree)
+    assert canonical(pyml.mocus(fault_tree, engine='bitset')) == expected
+    assert canonical(pyml.mocus(fault_tree, engine='bdd')) == expected
+    assert canonical(pyml.mocus(fault_tree, modularize=True)) == expected
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_truncation_keeps_exactly_the_cutsets_within_the_limits(seed):
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True)
+    probabilities = {row[0]: row[2] for row in fault_tree if row[1] == 'basic'}
+    expected = brute_force_cutsets(fault_tree)
+    assert canonical(pyml.mocus(fault_tree, max_order=2)) == [cutset for cutset in expected if len(cutset) <= 2]
+
+    def probability(cutset):
+        result = 1.0
+        for event in cutset:
+            result *= probabilities[event]
+        return result
+
+    cutoff = 1e-3
+    assert canonical(pyml.mocus(fault_tree, cutoff=cutoff)) == [cutset for cutset in expected if probability(cutset) >= cutoff]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_iter_cutsets_streams_in_increasing_order(seed):
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True)
+    cutsets = list(pyml.iter_cutsets(fault_tree))
+    assert [len(cutset) for cutset in cutsets] == sorted(len(cutset) for cutset in cutsets)
+    assert canonical(cutsets) == brute_force_cutsets(fault_tree)
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_memory_limit_spills_without_changing_the_cutsets(seed):
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True)
+    expected = brute_force_cutsets(fault_tree)
+    assert canonical(pyml.mocus(fault_tree, memory_limit=1)) == expected
+    assert canonical(pyml.mocus(fault_tree, modularize=True, memory_limit=1)) == expected
+
+
+def test_workers_match_the_serial_expansion():
+    for seed in range(3):
+        fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True)
+        assert canonical(pyml.mocus(fault_tree, workers=2)) == brute_force_cutsets(fault_tree)
+        for truncation in ({'max_order': 2, 'cutoff': 1e-3}, {'max_order': 1}, {'cutoff': 1e-2}):
+            serial = pyml.mocus(fault_tree, **truncation)
+            parallel = pyml.mocus(fault_tree, workers=3, **truncation)
+            assert parallel == serial
+            assert parallel.truncated_rows == serial.truncated_rows
+            assert parallel.truncated_probability == pytest.approx(serial.truncated_probability, rel=1e-12)
+
+
+@pytest.mark.parametrize('options', [{}, {'modularize': True}, {'memory_limit': 1}, {'cache': True}])
+def test_order_truncation_reports_the_dropped_probability_mass(options):
+    options = {**options, 'cache': pyml.CutsetCache()} if 'cache' in options else options
+    fault_tree = [('TOP', 'or', '', ['A', 'G']), ('G', 'and', '', ['B', 'C']),
+                  ('A', 'basic', 0.1, []), ('B', 'basic', 0.2, []), ('C', 'basic', 0.3, [])]
+    cutsets = pyml.mocus(fault_tree, max_order=1, **options)
+    assert cutsets == [['A']]
+    assert cutsets.truncated_rows == 1
+    assert cutsets.truncated_probability == pytest.approx(0.06)
+
+    qualitative = [(row[0], row[1], row[3]) for row in fault_tree]
+    cutsets = pyml.mocus(qualitative, max_order=1, **options)
+    assert cutsets == [['A']]
+    assert cutsets.truncated_probability is None
@@ -0,0 +1,79 @@
+import itertools
+
+import pytest
+
+import pyml
+from helpers import brute_force_cutsets, canonical, random_tree
+
+HEADINGS = ['H1', 'H2', 'H3']
+
+
+def heading_fault_trees(seed):
+    """
+    Returns random heading fault trees that share their basic events, with gate names prefixed by the heading.
+    """
+    headings = {}
+    for offset, heading in enumerate(HEADINGS):
+        fault_tree = random_tree(10 * seed + offset, n_gates=4, n_events=7, quantitative=True)
+        gates = {row[0] for row in fault_tree if row[1] != 'basic'}
+        rename = lambda name: f'{heading}_{name}' if name in gates else name
+        headings[heading] = [(rename(name), node_type, probability, [rename(branch) for branch in branches])
+                             for name, node_type, probability, branches in fault_tree]
+    return headings
+
+
+def all_sequences():
+    sequences = []
+    for states in itertools.product(['success', 'failure', None], repeat=len(HEADINGS)):
+        branches = [(heading, state) for heading, state in zip(HEADINGS, states) if state is not None]
+        sequences.append((f'S{len(sequences)}', branches, 'CD' if 'failure' in states else 'OK'))
+    return sequences
+
+
+def expected_sequence_cutsets(headings, branches):
+    """
+    Returns the minimal cutsets of the failed headings together, less those containing a cutset of a heading on a success branch.
+    """
+    failed = [heading for heading, state in branches if state == 'failure']
+    succeeded = [heading for heading, state in branches if state == 'success']
+    if failed:
+        rows = [('TOP', 'and', '', [headings[heading][0][0] for heading in failed])]
+        rows += [row for heading in failed for row in headings[heading] if row[1] != 'basic']
+        rows += list({row[0]: row for heading in failed for row in headings[heading] if row[1] == 'basic'}.values())
+        cutsets = brute_force_cutsets(rows)
+    else:
+        cutsets = [[]]
+    success_cutsets = [set(cutset) for heading in succeeded for cutset in brute_force_cutsets(headings[heading])]
+    return canonical(cutset for cutset in cutsets if not any(success <= set(cutset) for success in success_cutsets))
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_sequence_cutsets_match_brute_force(seed):
+    headings = heading_fault_trees(seed)
+    sequences = all_sequences()
+    tree = pyml.EventTree(('IE', 1e-2), headings, sequences)
+    cutsets = tree.sequence_cutsets()
+    for name, branches, end_state in sequences:
+        assert all(cutset[0] == 'IE' for cutset in cutsets[name])
+        assert canonical(cutset[1:] for cutset in cutsets[name]) == expected_sequence_cutsets(headings, branches)
+
+
+@pytest.mark.parametrize('seed', range(8))
+def test_quantify_matches_each_sequence_quantified_alone(seed):
+    headings = heading_fault_trees(seed)
+    sequences = all_sequences()
+    tree = pyml.EventTree(('IE', 1e-2), headings, sequences)
+    table = tree.quantify()
+    cutsets = tree.sequence_cutsets()
+    for name, branches, end_state in sequences:
+        events = [cutset[1:] for cutset in cutsets[name]]
+        if events == [[]]:
+            rare_event = mcub = 1.0
+        else:
+            results = pyml.quantify_cutsets(events, tree.probabilities, events=sorted(tree.probabilities))
+            rare_event, mcub = results['rare_event'][0], results['mcub'][0]
+        assert table.loc[name, 'End State'] == end_state
+        assert table.loc[name, 'Cutsets'] == len(events)
+        assert table.loc[name, 'Frequency'] == pytest.approx(1e-2 * rare_event, rel=1e-12, abs=1e-300)
+        assert table.loc[name, 'MCUB'] == pytest.approx(1e-2 * mcub, rel=1e-12, abs=1e-300)
+        assert str(table.loc[name, 'MCUB']) != '-0.0'
@@ -0,0 +1,59 @@
+import math
+
+import pytest
+
+import pyml
+from helpers import brute_force_cutsets, brute_force_probability, random_tree
+
+SEEDS = range(15)
+
+
+def basic_probabilities(fault_tree):
+    return {row[0]: row[2] for row in fault_tree if row[1] == 'basic'}
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_bdd_measures_match_brute_force_conditional_probabilities(seed):
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True, vote=seed % 2 == 1)
+    probabilities = basic_probabilities(fault_tree)
+    probability = brute_force_probability(fault_tree, probabilities)
+    importances = pyml.importance_measures(fault_tree)
+    assert sorted(importances.index) == sorted(pyml.FaultTree(fault_tree).event_names)
+    assert list(importances['Fussell-Vesely']) == sorted(importances['Fussell-Vesely'], reverse=True)
+    for event, row in importances.iterrows():
+        failed = brute_force_probability(fault_tree, {**probabilities, event: 1.0})
+        working = brute_force_probability(fault_tree, {**probabilities, event: 0.0})
+        assert row['Probability'] == probabilities[event]
+        assert row['Birnbaum'] == pytest.approx(failed - working, abs=1e-12)
+        assert row['Fussell-Vesely'] == pytest.approx((probability - working) / probability, abs=1e-9)
+        assert row['RAW'] == pytest.approx(failed / probability, rel=1e-9)
+        if working > 1e-12:
+            assert row['RRW'] == pytest.approx(probability / working, rel=1e-9)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_cutset_measures_match_the_rare_event_approximation(seed):
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True, vote=seed % 2 == 1)
+    probabilities = basic_probabilities(fault_tree)
+    cutsets = brute_force_cutsets(fault_tree)
+    rare_event = lambda probabilities: sum(math.prod(probabilities[event] for event in cutset) for cutset in cutsets)
+    probability = rare_event(probabilities)
+    for importances in (pyml.importance_measures(fault_tree, method='cutsets'), pyml.importance_measures(fault_tree, method='cutsets', cutsets=cutsets)):
+        for event, row in importances.iterrows():
+            failed = rare_event({**probabilities, event: 1.0})
+            working = rare_event({**probabilities, event: 0.0})
+            assert row['Birnbaum'] == pytest.approx(failed - working, rel=1e-9, abs=1e-15)
+            assert row['Fussell-Vesely'] == pytest.approx((probability - working) / probability, abs=1e-9)
+            assert row['RAW'] == pytest.approx(failed / probability, rel=1e-9)
+
+
+def test_probabilities_override_those_in_the_fault_tree():
+    fault_tree = random_tree(2, n_gates=8, n_events=9, quantitative=True)
+    probabilities = {event: probability / 3 for event, probability in basic_probabilities(fault_tree).items()}
+    changed = [(row[0], row[1], probabilities[row[0]], row[3]) if row[1] == 'basic' else row for row in fault_tree]
+    assert pyml.importance_measures(fault_tree, probabilities).equals(pyml.importance_measures(changed))
+
+
+def test_unknown_method_raises():
+    with pytest.raises(pyml.ErrorMsg):
+        pyml.importance_measures(random_tree(0, quantitative=True), method='exact')
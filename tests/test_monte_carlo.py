@@ -0,0 +1,97 @@
+import random
+
+import numpy as np
+import pytest
+
+import pyml
+from helpers import basic_events, brute_force_probability, random_tree
+
+SEEDS = range(10)
+
+
+def random_distributions(fault_tree, seed):
+    """
+    Returns uniform and beta distributions for the basic events, with their means.
+    """
+    rng = random.Random(seed)
+    distributions, means = {}, {}
+    for event in basic_events(fault_tree):
+        if rng.random() < 0.5:
+            low = rng.uniform(0.001, 0.2)
+            high = low + rng.uniform(0, 0.3)
+            distributions[event], means[event] = ('uniform', low, high), (low + high) / 2
+        else:
+            a, b = rng.uniform(0.5, 4), rng.uniform(2, 20)
+            distributions[event], means[event] = ('beta', a, b), a / (a + b)
+    return distributions, means
+
+
+def separate_tree(seed):
+    """
+    Returns a random fault tree in which every gate and basic event has a single parent, so its gates have independent inputs.
+    """
+    rng = random.Random(seed)
+    fault_tree, pending, count = [], ['G0'], 1
+    while pending:
+        gate = pending.pop()
+        branches = []
+        for i in range(rng.randint(2, 3)):
+            if count < 6 and rng.random() < 0.5:
+                branches.append(f'G{count}')
+                pending.append(f'G{count}')
+                count += 1
+            else:
+                branches.append(f'E{len(fault_tree)}_{i}')
+        fault_tree.append((gate, rng.choice(['and', 'or', 'Vote 2']), '', branches))
+    events = [branch for row in fault_tree for branch in row[3] if branch.startswith('E')]
+    return fault_tree + [(event, 'basic', round(rng.uniform(0.001, 0.3), 4), []) for event in events]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_fixed_probabilities_give_the_exact_top_event_probability(seed):
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True, vote=seed % 2 == 1)
+    expected = brute_force_probability(fault_tree, {row[0]: row[2] for row in fault_tree if row[1] == 'basic'})
+    results = pyml.fault_tree_monte_carlo(fault_tree, samples=50, seed=seed)
+    assert results['samples'] == pytest.approx(np.full(50, expected), rel=1e-12)
+    assert results['std'] == pytest.approx(0, abs=1e-15)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_mean_matches_the_probability_at_the_mean_event_probabilities(seed):
+    # the top event probability is linear in each independent event probability, so its mean is its value at the means
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True, vote=seed % 2 == 1)
+    distributions, means = random_distributions(fault_tree, seed)
+    results = pyml.fault_tree_monte_carlo(fault_tree, distributions, samples=20000, seed=seed, latin_hypercube=True, block_size=5000)
+    assert results['mean'] == pytest.approx(brute_force_probability(fault_tree, means), abs=4 * results['std'] / np.sqrt(20000))
+    samples = results['samples']
+    assert np.all((samples >= 0) & (samples <= 1))
+    assert samples.min() <= results['percentiles'][5] <= results['percentiles'][50] <= results['percentiles'][95] <= samples.max()
+    assert results['histogram'][0].sum() == 20000
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_gates_method_is_exact_when_gate_inputs_are_independent(seed):
+    fault_tree = separate_tree(seed)
+    probabilities = {row[0]: row[2] for row in fault_tree if row[1] == 'basic'}
+    results = pyml.fault_tree_monte_carlo(fault_tree, samples=20, seed=seed, method='gates')
+    assert results['samples'] == pytest.approx(np.full(20, brute_force_probability(fault_tree, probabilities)), rel=1e-12)
+
+    distributions, means = random_distributions(fault_tree, seed)
+    results = pyml.fault_tree_monte_carlo(fault_tree, distributions, samples=20000, seed=seed, latin_hypercube=True, method='gates')
+    assert results['mean'] == pytest.approx(brute_force_probability(fault_tree, means), abs=4 * results['std'] / np.sqrt(20000))
+
+
+def test_lognormal_median_and_error_factor():
+    fault_tree = [('Top', 'or', '', ['Pump fails']), ('Pump fails', 'basic', 0.1, [])]
+    results = pyml.fault_tree_monte_carlo(fault_tree, {'Pump fails': ('lognormal', 1e-3, 3)}, samples=20000, seed=4, latin_hypercube=True)
+    assert results['percentiles'][50] == pytest.approx(1e-3, rel=1e-2)
+    assert results['percentiles'][95] == pytest.approx(3e-3, rel=1e-2)
+
+
+def test_results_do_not_depend_on_the_number_of_workers():
+    fault_tree = random_tree(3, n_gates=8, n_events=9, quantitative=True, vote=True)
+    distributions, _ = random_distributions(fault_tree, 3)
+    serial = pyml.fault_tree_monte_carlo(fault_tree, distributions, samples=3000, seed=3, block_size=700)
+    parallel = pyml.fault_tree_monte_carlo(fault_tree, distributions, samples=3000, seed=3, block_size=700, workers=2)
+    assert np.array_equal(serial['samples'], parallel['samples'])
+    assert serial['percentiles'] == parallel['percentiles']
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+import pyml
+from helpers import brute_force_probability, random_tree
+
+SEEDS = range(15)
+
+
+def basic_probabilities(fault_tree):
+    return {row[0]: row[2] for row in fault_tree if row[1] == 'basic'}
+
+
+@pytest.mark.parametrize('rare_event', [True, False])
+@pytest.mark.parametrize('seed', SEEDS)
+def test_updates_match_a_fresh_computation(seed, rare_event):
+    rng = random.Random(seed)
+    fault_tree = random_tree(seed, n_gates=10, n_events=9, quantitative=True, vote=seed % 2 == 1)
+    probabilities = basic_probabilities(fault_tree)
+    quantified = pyml.QuantifiedFaultTree(fault_tree, rare_event=rare_event)
+    for edit in range(20):
+        before = quantified.gate_probabilities()
+        changes = {event: rng.choice([probabilities[event], 0.0, 1.0, round(rng.uniform(0, 0.5), 3)]) for event in rng.sample(sorted(probabilities), rng.randint(1, 3))}
+        probabilities.update(changes)
+        changed = quantified.update(changes)
+        fresh = pyml.QuantifiedFaultTree(fault_tree, probabilities, rare_event=rare_event)
+        after = quantified.gate_probabilities()
+        assert after == fresh.gate_probabilities()
+        assert quantified.probability() == fresh.probability()
+        assert sorted(changed) == sorted(gate for gate in after if after[gate] != before[gate])
+
+
+def test_exact_on_trees_without_shared_inputs():
+    fault_tree = [('Top', 'or', '', ['Power', 'Pumps', 'Valve']),
+                  ('Power', 'and', '', ['Grid', 'Diesel']),
+                  ('Pumps', 'Vote 2', '', ['Pump A', 'Pump B', 'Pump C']),
+                  ('Grid', 'basic', 0.01, []), ('Diesel', 'basic', 0.05, []),
+                  ('Pump A', 'basic', 0.1, []), ('Pump B', 'basic', 0.2, []), ('Pump C', 'basic', 0.3, []),
+                  ('Valve', 'basic', 0.002, [])]
+    probabilities = basic_probabilities(fault_tree)
+    quantified = pyml.QuantifiedFaultTree(fault_tree, rare_event=False)
+    assert quantified.probability() == pytest.approx(brute_force_probability(fault_tree, probabilities), rel=1e-12)
+    probabilities.update({'Diesel': 0.5, 'Pump B': 0.0})
+    assert sorted(quantified.update({'Diesel': 0.5, 'Pump B': 0.0})) == ['Power', 'Pumps', 'Top']
+    assert quantified.probability() == pytest.approx(brute_force_probability(fault_tree, probabilities), rel=1e-12)
+    assert quantified.probability('Pumps') == pytest.approx(0.1 * 0.3, rel=1e-12)
+    assert quantified.update({'Grid': 0.01}) == []
+
+
+def test_gates_cannot_be_updated():
+    quantified = pyml.QuantifiedFaultTree(random_tree(0, quantitative=True))
+    with pytest.raises(pyml.ErrorMsg):
+        quantified.update({'G1': 0.5})
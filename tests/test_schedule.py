@@ -0,0 +1,153 @@
+import random
+
+import pytest
+
+import pyml
+
+SEEDS = range(30)
+
+
+def random_project(seed, size=10, halves=False):
+    """
+    Returns a random acyclic project Node with lags, whose links only go from lower to higher task numbers. With ``halves`` the durations are multiples of 0.5.
+    """
+    rng = random.Random(seed)
+    project = pyml.Node('project')
+    for i in range(size):
+        duration = rng.randint(0, 12) / 2 if halves else rng.randint(0, 6)
+        project.add(pyml.Node(f'T{i}', duration=duration, lag=rng.choice([0, 0, 1, 2])))
+    for i in range(size):
+        for j in range(i + 1, size):
+            if rng.random() < 0.3:
+                project.link(f'T{i}', f'T{j}')
+    return project
+
+
+def times(project):
+    return {node.name: (node.es, node.ef, node.ls, node.lf) for node in project.nodes}
+
+
+def full_schedule(project):
+    network = pyml.ProjectNetwork.from_node(project).schedule()
+    rows = zip(network.es.tolist(), network.ef.tolist(), network.ls.tolist(), network.lf.tolist())
+    return dict(zip(network.names, rows)), network
+
+
+def random_edit(project, rng):
+    first, second = sorted(rng.sample(range(len(project.nodes)), 2))
+    from_node, to_node = f'T{first}', f'T{second}'
+    choice = rng.random()
+    if choice < 0.3:
+        return project.set_duration(from_node, rng.randint(0, 6))
+    if choice < 0.5:
+        return project.set_lag(to_node, rng.randint(0, 2))
+    if project.lookup_node(to_node) in project.lookup_node(from_node).to_nodes:
+        return project.remove_link(from_node, to_node)
+    return project.add_link(from_node, to_node)
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_update_all_matches_the_array_passes(seed):
+    project = random_project(seed)
+    project.update_all()
+    expected, network = full_schedule(project)
+    assert times(project) == expected
+    assert [node.name for node in project.get_critical_path()] == [network.names[task] for task in network.critical_path()]
+
+
+@pytest.mark.parametrize('seed', SEEDS)
+def test_incremental_edits_match_a_full_reschedule(seed):
+    rng = random.Random(seed)
+    project = random_project(seed)
+    project.update_all()
+    for _ in range(10):
+        before = times(project)
+        changed = random_edit(project, rng)
+        after = times(project)
+        expected, network = full_schedule(project)
+        assert after == expected
+        assert sorted(changed) == sorted(name for name in after if after[name] != before[name])
+        assert [node.name for node in project.get_critical_path()] == [network.names[task] for task in network.critical_path()]
+        assert project.duration == sum(node.duration for node in project.get_critical_path())
+
+
+def test_first_edit_reports_tasks_rescheduled_when_it_starts():
+    project = pyml.Node('project')
+    for name, duration in [('A', 3), ('B', 2), ('C', 1)]:
+        project.add(pyml.Node(name, duration=duration))
+    project.link('A', 'B')
+    project.update_all()
+    assert project.set_duration('A', 3) == []
+    project.link('C', 'B')  # a plain link drops the incremental state
+    assert project.set_duration('A', 3) == ['C']
+    assert times(project) == full_schedule(project)[0]
+
+
+def floats(project):
+    return {node.name: (node.total_float, node.free_float, node.drag) for node in project.nodes}
+
+
+def brute_force_floats(project):
+    """
+    Returns the floats from their definitions, with the drag of each task found by rescheduling with its duration set to zero.
+    """
+    _, network = full_schedule(project)
+    finish = network.finish
+    result = {}
+    for task, name in enumerate(network.names):
+        successors = network.successor_ids[network.successor_offsets[task]:network.successor_offsets[task + 1]]
+        free_float = min((network.es[successor] - network.lags[successor] for successor in successors), default=finish) - network.ef[task]
+        durations = network.durations.copy()
+        durations[task] = 0
+        drag = finish - network.passes(durations)[1].max()
+        result[name] = (network.total_float[task], free_float, drag)
+    return result
+
+
+@pytest.mark.parametrize('halves', [False, True])
+@pytest.mark.parametrize('seed', SEEDS)
+def test_floats_and_drag_match_their_definitions(seed, halves):
+    rng = random.Random(seed)
+    project = random_project(seed, halves=halves)
+    project.update_all()
+    assert floats(project) == brute_force_floats(project)
+    for _ in range(5):
+        random_edit(project, rng)
+        before = times(project)
+        assert floats(project) == brute_force_floats(project)
+        assert times(project) == before  # reading the floats does not reschedule
+
+
+def test_floats_follow_link_edits_that_move_no_times():
+    project = pyml.Node('project')
+    for name, duration in [('A', 2), ('B', 5), ('C', 1), ('P', 7), ('D', 3)]:
+        project.add(pyml.Node(name, duration=duration))
+    for from_name, to_name in [('A', 'C'), ('B', 'C'), ('A', 'D'), ('P', 'D')]:
+        project.link(from_name, to_name)
+    project.update_all()
+    assert project.lookup_node('A').free_float == 3
+    assert project.remove_link('A', 'C') == []
+    assert project.lookup_node('A').free_float == 5
+
+
+def test_floats_of_unscheduled_tasks_are_none():
+    project = pyml.Node('project')
+    project.add(pyml.Node('A', duration=2.5))
+    project.add(pyml.Node('B', duration=1))
+    project.update_all()
+    assert project.lookup_node('A').drag == 1.5
+    project.add(pyml.Node('C', duration=1))
+    assert floats(project) == dict.fromkeys('ABC', (None, None, None))
+    project.update_all()
+    assert project.lookup_node('C').total_float == 1.5
+
+
+def test_schedule_table_lists_every_task():
+    tasks = [('A', {'Duration': 3}), ('B', {'Duration': 2}), ('C', {'Duration': 4}), ('D', {'Duration': 1})]
+    dependencies = [('A', 'B'), ('A', 'C'), ('B', 'D'), ('C', 'D')]
+    table = pyml.schedule_table(tasks, dependencies)
+    assert list(table.index) == ['A', 'B', 'C', 'D']
+    assert table['Total Float'].tolist() == [0, 2, 0, 0]
+    assert table['Free Float'].tolist() == [0, 2, 0, 0]
+    assert table['Drag'].tolist() == [3, 0, 2, 1]
+    assert table['Critical'].tolist() == [True, False, True, True]
@@ -0,0 +1,79 @@
+import random
+
+import numpy as np
+import pytest
+
+import pyml
+
+U = (np.arange(200000) + 0.5) / 200000  # evenly spaced variates, so sample moments are close to exact
+
+
+def random_tasks(seed, size=8):
+    """
+    Returns random tasks, dependencies that only go from lower to higher task numbers, and a distribution for every task.
+    """
+    rng = random.Random(seed)
+    tasks = [(f'T{i}', {'Duration': rng.randint(1, 6)}) for i in range(size)]
+    dependencies = [(f'T{i}', f'T{j}') for i in range(size) for j in range(i + 1, size) if rng.random() < 0.3]
+    distributions = {}
+    for i in range(size):
+        low = rng.randint(0, 4)
+        mode = low + rng.randint(0, 4)
+        distributions[f'T{i}'] = (rng.choice(['triangular', 'pert']), low, mode, mode + rng.randint(1, 4))
+    return tasks, dependencies, distributions
+
+
+@pytest.mark.parametrize('seed', range(2))
+def test_results_do_not_depend_on_the_number_of_workers(seed):
+    tasks, dependencies, distributions = random_tasks(seed)
+    serial = pyml.schedule_risk(tasks, dependencies, distributions, samples=2500, seed=seed, latin_hypercube=seed == 1, block_size=400)
+    parallel = pyml.schedule_risk(tasks, dependencies, distributions, samples=2500, seed=seed, latin_hypercube=seed == 1, block_size=400, workers=2)
+    assert np.array_equal(serial['samples'], parallel['samples'])
+    assert serial['criticality'] == parallel['criticality']
+    assert serial['percentiles'] == parallel['percentiles']
+
+
+@pytest.mark.parametrize('latin_hypercube', [False, True])
+def test_every_task_of_a_forced_chain_is_always_critical(latin_hypercube):
+    tasks = [(name, {'Duration': 1}) for name in 'ABCD']
+    dependencies = [('A', 'B'), ('B', 'C'), ('C', 'D')]
+    distributions = {'A': ('triangular', 1, 2, 6), 'B': ('pert', 0, 1, 3), 'C': ('uniform', 2, 5), 'D': 4}
+    results = pyml.schedule_risk(tasks, dependencies, distributions, samples=1000, seed=1, latin_hypercube=latin_hypercube)
+    assert results['criticality'] == {name: 1.0 for name in 'ABCD'}
+    assert results['samples'].min() >= 1 + 0 + 2 + 4
+    assert results['samples'].max() <= 6 + 3 + 5 + 4
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_fixed_durations_give_the_deterministic_schedule(seed):
+    tasks, dependencies, _ = random_tasks(seed)
+    results = pyml.schedule_risk(tasks, dependencies, samples=300, seed=seed, block_size=128)
+    network = pyml.ProjectNetwork.from_tasks(tasks, dependencies).schedule()
+    critical = {name: float(total_float == 0) for name, total_float in zip(network.names, network.ls - network.es)}
+    assert results['criticality'] == critical
+    assert np.all(results['samples'] == network.ef.max())
+    assert results['std'] == 0
+
+
+@pytest.mark.parametrize('low, mode, high', [(0, 0, 1), (1, 2, 6), (2, 5, 5), (3, 7, 12)])
+def test_triangular_inversion_matches_the_distribution(low, mode, high):
+    durations = pyml.sample_distribution(('triangular', low, mode, high), U)
+    assert durations.min() >= low and durations.max() <= high
+    assert durations.mean() == pytest.approx((low + mode + high) / 3, rel=1e-4)
+    x = np.linspace(low, high, 101)[1:-1]
+    cdf = np.where(x < mode, (x - low) ** 2 / ((high - low) * (mode - low or 1)), 1 - (high - x) ** 2 / ((high - low) * (high - mode or 1)))
+    assert pyml.sample_distribution(('triangular', low, mode, high), cdf) == pytest.approx(x, abs=1e-9)
+
+
+@pytest.mark.parametrize('low, mode, high', [(0, 0, 1), (1, 2, 6), (2, 5, 5), (3, 7, 12)])
+def test_pert_inversion_matches_the_distribution(low, mode, high):
+    durations = pyml.sample_distribution(('pert', low, mode, high), U)
+    assert durations.min() >= low and durations.max() <= high
+    mean = (low + 4 * mode + high) / 6
+    assert durations.mean() == pytest.approx(mean, rel=1e-4)
+    assert durations.var() == pytest.approx((mean - low) * (high - mean) / 7, rel=1e-3)
+
+
+def test_degenerate_ranges_give_fixed_durations():
+    assert np.all(pyml.sample_distribution(('triangular', 3, 3, 3), U[:10]) == 3)
+    assert np.all(pyml.sample_distribution(('pert', 3, 3, 3), U[:10]) == 3)
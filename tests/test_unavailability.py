@@ -0,0 +1,84 @@
+import math
+import random
+
+import numpy as np
+import pytest
+
+import pyml
+from helpers import basic_events, brute_force_probability, random_tree
+
+TIMES = np.linspace(0, 2000, 21)
+
+
+def random_models(fault_tree, seed):
+    rng = random.Random(seed)
+    models = {}
+    for event in basic_events(fault_tree):
+        kind = rng.randrange(4)
+        rate = rng.uniform(1e-5, 1e-3)
+        if kind == 0:
+            models[event] = pyml.ConstantFailureRate(rate)
+        elif kind == 1:
+            models[event] = pyml.RepairableComponent(rate, rng.uniform(1e-3, 1e-1))
+        elif kind == 2:
+            models[event] = pyml.PeriodicallyTested(rate, rng.choice([200, 350, 500]), first_test=rng.choice([None, 100]))
+        else:
+            models[event] = round(rng.uniform(0.001, 0.1), 4)
+    return models
+
+
+def unavailability(model, t):
+    """
+    Returns the closed form unavailability of a model at one time.
+    """
+    if isinstance(model, pyml.ConstantFailureRate):
+        return 1 - math.exp(-model.failure_rate * t)
+    if isinstance(model, pyml.RepairableComponent):
+        total_rate = model.failure_rate + model.repair_rate
+        return model.failure_rate / total_rate * (1 - math.exp(-total_rate * t))
+    if isinstance(model, pyml.PeriodicallyTested):
+        since_test = t if t < model.first_test else (t - model.first_test) % model.test_interval
+        return 1 - math.exp(-model.failure_rate * since_test)
+    return model
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_models_match_their_closed_forms(seed):
+    fault_tree = random_tree(seed, n_events=12, quantitative=True)
+    for model in random_models(fault_tree, seed).values():
+        if isinstance(model, pyml.ReliabilityModel):
+            assert model.unavailability(TIMES) == pytest.approx([unavailability(model, t) for t in TIMES], rel=1e-12, abs=1e-15)
+
+
+def test_periodically_tested_components_are_restored_at_each_test():
+    model = pyml.PeriodicallyTested(1e-3, 100, first_test=50)
+    assert model.unavailability([0, 49.5, 50, 150, 250]) == pytest.approx([0, 1 - math.exp(-0.0495), 0, 0, 0], abs=1e-12)
+    assert model.unavailability(99.5) == pytest.approx(1 - math.exp(-0.0495), rel=1e-9)
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_curve_matches_brute_force_at_every_time(seed):
+    fault_tree = random_tree(seed, n_gates=8, n_events=9, quantitative=True, vote=seed % 2 == 1)
+    models = random_models(fault_tree, seed)
+    results = pyml.unavailability_curve(fault_tree, TIMES, models)
+    expected = [brute_force_probability(fault_tree, {event: unavailability(model, t) for event, model in models.items()}) for t in TIMES]
+    assert results['unavailability'] == pytest.approx(expected, rel=1e-10, abs=1e-15)
+    assert results['peak'] == pytest.approx(max(expected), rel=1e-10, abs=1e-15)
+    assert results['peak'] == results['unavailability'][list(TIMES).index(results['peak_time'])]
+    assert results['mean'] == pytest.approx(sum((a + b) / 2 * (t1 - t0) for a, b, t0, t1 in zip(expected, expected[1:], TIMES, TIMES[1:])) / (TIMES[-1] - TIMES[0]), rel=1e-10, abs=1e-15)
+
+
+def test_models_in_the_fault_tree_and_the_gates_method():
+    fault_tree = [('Top', 'or', '', ['Power', 'Pump']),
+                  ('Power', 'and', '', ['Grid', 'Diesel']),
+                  ('Grid', 'basic', pyml.RepairableComponent(1e-4, 1e-1), []),
+                  ('Diesel', 'basic', pyml.PeriodicallyTested(1e-3, 720), []),
+                  ('Pump', 'basic', pyml.ConstantFailureRate(2e-5), [])]
+    models = {row[0]: row[2] for row in fault_tree if row[1] == 'basic'}
+    expected = [brute_force_probability(fault_tree, {event: unavailability(model, t) for event, model in models.items()}) for t in TIMES]
+    assert pyml.unavailability_curve(fault_tree, TIMES)['unavailability'] == pytest.approx(expected, rel=1e-10, abs=1e-15)
+    # no basic event is shared, so evaluating the gates as if their inputs were independent is exact
+    assert pyml.unavailability_curve(fault_tree, TIMES, method='gates')['unavailability'] == pytest.approx(expected, rel=1e-10, abs=1e-15)
+    single = pyml.unavailability_curve(fault_tree, 1000.0)
+    assert single['unavailability'] == pytest.approx([expected[10]], rel=1e-10)
+    assert single['mean'] == single['peak']